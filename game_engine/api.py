@@ -1,16 +1,273 @@
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+import atexit
 import json
+import os
 import sys
+import threading
+import time
+import weakref
 from tictactoe import TicTacToe, TicTacToeAI
 from connectfour import ConnectFour, ConnectFourAI
-from chess import Chess, ChessAI
+from chess import Chess, ChessAI, set_search_pool_size, shutdown_search_pools, start_search_pool
+from game_store import GameStore
+from metrics import SearchMetrics
+from move_cache import MoveCache
+from persistence import GameSnapshots
+from ponder import Ponderer, chess_job, connectfour_job, connectfour_key
+
+GAME_TYPES = {
+    'tictactoe': (TicTacToe, TicTacToeAI),
+    'connectfour': (ConnectFour, ConnectFourAI),
+    'chess': (Chess, ChessAI),
+}
+
+# Answers of full-depth searches shared by all games, so that common
+# openings at the same difficulty are searched once per server; up to
+# MOVE_CACHE_SIZE positions are kept (0 turns the cache off).
+MOVE_CACHE_SIZE = int(os.environ.get('MOVE_CACHE_SIZE', '50000'))
+move_cache = MoveCache(MOVE_CACHE_SIZE) if MOVE_CACHE_SIZE else None
+
+# Size of the one process pool shared by all root-parallel chess searches,
+# and so the most a game can ask for with 'search_workers' on /new (which
+# also defaults to it). The pool is started here, before the server starts
+# any thread, so that its workers can be forked safely.
+CHESS_SEARCH_WORKERS = int(os.environ.get('CHESS_SEARCH_WORKERS', '1'))
+set_search_pool_size(CHESS_SEARCH_WORKERS)
+if CHESS_SEARCH_WORKERS > 1:
+    start_search_pool()
+
+# Every game is snapshotted to this SQLite file after each request so that it
+# survives restarts and LRU eviction; it is read back lazily on first access.
+# Set GAME_SNAPSHOT_PATH to an empty string to disable persistence.
+GAME_SNAPSHOT_PATH = os.environ.get(
+    'GAME_SNAPSHOT_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'games.sqlite3'))
+snapshots = GameSnapshots(GAME_SNAPSHOT_PATH) if GAME_SNAPSHOT_PATH else None
+if snapshots is not None:
+    atexit.register(snapshots.close)
+
+
+def make_ai(game_type, difficulty, settings):
+    """The AI for a game of ``game_type`` with its checked /new ``settings``.
+
+    Settings a game does not have take the defaults of /new.
+    """
+    if game_type == 'chess':
+        return ChessAI(difficulty, settings.get('tt_size_mb', 1), settings.get('search_workers', CHESS_SEARCH_WORKERS),
+                       move_cache=move_cache)
+    if game_type == 'connectfour':
+        return ConnectFourAI(difficulty, settings.get('tt_size_mb', 1), move_cache=move_cache)
+    return TicTacToeAI(difficulty, move_cache=move_cache)
+
+
+def restore_game(game_id):
+    snapshot = snapshots.load(game_id)
+    if snapshot is None:
+        return None
+    game_type, difficulty, state, settings = snapshot
+    ponder = settings.pop('ponder', False)
+    # the limits may have been lowered since the game was saved
+    if 'tt_size_mb' in settings:
+        settings['tt_size_mb'] = min(settings['tt_size_mb'], MAX_TT_SIZE_MB)
+    if 'search_workers' in settings:
+        settings['search_workers'] = min(settings['search_workers'], CHESS_SEARCH_WORKERS)
+    game_cls, _ = GAME_TYPES[game_type]
+    return {'game': game_cls.from_state(state), 'ai': make_ai(game_type, difficulty, settings), 'type': game_type,
+            'ponder': ponder, 'settings': settings}
+
+
+def forget_game(game_id, reason):
+    ponderer.stop(game_id, wait=False)
+    # LRU-evicted games stay on disk to be restored; idle ones have expired
+    if snapshots is not None and reason == 'idle':
+        snapshots.delete(game_id)
+
+
+def tt_tally(game_data):
+    """A game's transposition table counters, summed per game type for /api/health."""
+    tt = getattr(game_data['ai'], 'tt', None)
+    if tt is None:
+        return None
+    return {'hits': tt.hits, 'misses': tt.misses, 'memory_bytes': tt.memory_bytes()}
+
+
+# Games are evicted least-recently-used once MAX_GAMES are held, and after
+# GAME_IDLE_TTL seconds without a request.
+MAX_GAMES = int(os.environ.get('MAX_GAMES', '200000'))
+GAME_IDLE_TTL = float(os.environ.get('GAME_IDLE_TTL', '3600'))
+# After GAME_TRIM_AFTER idle seconds a game keeps its board but its AI drops
+# its search tables.
+GAME_TRIM_AFTER = float(os.environ.get('GAME_TRIM_AFTER', '120'))
+games = GameStore(MAX_GAMES, GAME_IDLE_TTL, trim_after=GAME_TRIM_AFTER,
+                  loader=restore_game if snapshots else None,
+                  on_evict=forget_game, tally=tt_tally)
+
+# One lock per game id so that two requests for the same game never
+# interleave; requests for different games run concurrently. Locks are
+# dropped automatically once no request holds them.
+game_locks = weakref.WeakValueDictionary()
+game_locks_guard = threading.Lock()
+
+# Largest transposition table a game may ask for with 'tt_size_mb' on /new;
+# larger requests are cut down to this size.
+MAX_TT_SIZE_MB = float(os.environ.get('MAX_TT_SIZE_MB', '64'))
+
+# AI searches run on a bounded pool so that a burst of hard games cannot
+# occupy every request thread; health checks and cheap endpoints never wait
+# for it.
+SEARCH_THREADS = int(os.environ.get('SEARCH_THREADS', str(os.cpu_count() or 1)))
+search_executor = ThreadPoolExecutor(max_workers=SEARCH_THREADS, thread_name_prefix='search')
+
+# /api/batch plays the games in one request concurrently, one game per
+# thread; each game's AI replies still go through search_executor.
+BATCH_THREADS = int(os.environ.get('BATCH_THREADS', str(SEARCH_THREADS)))
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_THREADS, thread_name_prefix='batch')
+
+
+def game_lock(game_id):
+    with game_locks_guard:
+        lock = game_locks.get(game_id)
+        if lock is None:
+            lock = game_locks[game_id] = threading.Lock()
+        return lock
+
+
+# Games created with 'ponder': true keep searching the opponent's possible
+# replies after each AI move, on PONDER_THREADS threads shared by the whole
+# server and for at most PONDER_MS of search per move; pondering waits while
+# any request's search runs. PONDER_THREADS=0 turns it off.
+PONDER_THREADS = int(os.environ.get('PONDER_THREADS', '1'))
+PONDER_MS = float(os.environ.get('PONDER_MS', '3000'))
+ponderer = Ponderer(PONDER_THREADS, PONDER_MS)
+atexit.register(ponderer.shutdown)
+
+
+def run_search(func, *args):
+    with ponderer.foreground():
+        return search_executor.submit(func, *args).result()
+
+
+# Move latency and search counters for /api/metrics.
+metrics = SearchMetrics()
+
+
+def run_measured_search(ai, func, *args):
+    """``run_search`` that also returns the search's stats.
+
+    The AIs keep running counters, so a search is measured by the difference
+    before and after and costs nothing extra to record.
+    """
+    tt = getattr(ai, 'tt', None)
+    nodes, cutoffs = ai.nodes, ai.cutoffs
+    tt_hits = tt.hits if tt is not None else 0
+    start = time.perf_counter()
+    move = run_search(func, *args)
+    elapsed = time.perf_counter() - start
+    stats = {
+        'nodes': ai.nodes - nodes,
+        'cutoffs': ai.cutoffs - cutoffs,
+        'max_depth_reached': ai.seldepth,
+        'time_ms': round(elapsed * 1000, 3),
+        'nps': round((ai.nodes - nodes) / elapsed) if elapsed else 0
+    }
+    if tt is not None:
+        stats['tt_hits'] = tt.hits - tt_hits
+    return move, stats
+
+
+# AIs searching for a request right now, by game id, so that /api/move_now
+# can tell them to stop.
+active_searches = {}
+
+
+def run_game_search(game_id, ai, func, *args):
+    """``run_measured_search`` that ``/api/move_now`` can cut short; the
+    search then returns the best move of its last completed depth."""
+    ai.stop_requested = False
+    active_searches[game_id] = ai
+    try:
+        return run_measured_search(ai, func, *args)
+    finally:
+        active_searches.pop(game_id, None)
+
+
+def record_move(data, game_type, ai, started, response, stats=None):
+    """Add a move to the metrics and attach ``stats`` if the client asked."""
+    metrics.record(game_type, ai.difficulty, (time.perf_counter() - started) * 1000, stats)
+    if stats is not None and data.get('stats'):
+        response['stats'] = stats
+    return response
+
+
+def save_game(game_id):
+    """Re-measure ``game_id`` after a request and queue its snapshot."""
+    game_data = games.refresh(game_id)
+    if game_data is not None and snapshots is not None:
+        snapshots.save(game_id, game_data['type'], game_data['ai'].difficulty,
+                       game_data['game'].to_state(),
+                       dict(game_data.get('settings', {}), ponder=game_data.get('ponder', False)))
+
+
+def chess_move_map(game):
+    """``Chess.move_map`` in JSON form: ``{'row,col': [[to_row, to_col], ...]}``."""
+    return {f'{row},{col}': targets for (row, col), targets in game.move_map().items()}
+
+
+class BadRequest(Exception):
+    """A malformed request; answered with status 400."""
+
+
+def requested_tt_size(data):
+    """The client's 'tt_size_mb', capped at MAX_TT_SIZE_MB."""
+    value = data.get('tt_size_mb', 1)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value >= 0:
+        raise BadRequest('tt_size_mb must be a non-negative number')
+    return min(value, MAX_TT_SIZE_MB)
+
+
+def requested_think_ms(data):
+    """The client's 'think_ms' for one move, or None for the AI's default."""
+    value = data.get('think_ms')
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value >= 0:
+        raise BadRequest('think_ms must be a non-negative number')
+    return value
+
+
+def requested_promotion(data):
+    """The client's 'promotion' piece letter, or None for a queen."""
+    value = data.get('promotion')
+    if value is not None and (not isinstance(value, str) or value.upper() not in ('Q', 'R', 'B', 'N')):
+        raise BadRequest("promotion must be one of 'Q', 'R', 'B' or 'N'")
+    return value
+
+
+def missing_game_error(game_id):
+    if games.is_expired(game_id):
+        return {'error': 'Game expired', 'expired': True}
+    return {'error': 'Game not found'}
+
+
+# Requests that never change a game and so need no snapshot afterwards.
+READ_ONLY_PATHS = {'/api/chess/valid_moves'}
+
+# Game id used by a /new request that does not name one.
+DEFAULT_GAME_IDS = {
+    '/api/tictactoe/new': 'ttt_1',
+    '/api/connectfour/new': 'cf_1',
+    '/api/chess/new': 'chess_1'
+}
+
+# Move requests that can be answered as a stream of search progress events
+# by adding 'stream': true to the body.
+STREAMING_PATHS = {'/api/chess/move', '/api/connectfour/move'}
 
-games = {}
 
 class GameAPIHandler(BaseHTTPRequestHandler):
-    def _set_headers(self, status=200):
+    def _set_headers(self, status=200, content_type='application/json'):
         self.send_response(status)
-        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-type', content_type)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
@@ -22,16 +279,28 @@ class GameAPIHandler(BaseHTTPRequestHandler):
     def do_GET(self):
         """Handle simple GET requests for health checks and root info.
 
-        Return JSON for '/' and '/api/health', 204 for '/favicon.ico' and
-        known .well-known probes, and 404 for other GETs. This prevents the
-        default 501 responses when a browser or tool probes the server.
+        Return JSON for '/', '/api/health' and '/api/metrics', 204 for
+        '/favicon.ico' and known .well-known probes, and 404 for other GETs.
+        This prevents the default 501 responses when a browser or tool probes
+        the server.
         """
         path = self.path
 
         # respond to health check and root
+        if path == '/api/metrics':
+            self._set_headers(200)
+            self.wfile.write(json.dumps(metrics.snapshot()).encode('utf-8'))
+            return
+
         if path == '/' or path == '/api/health':
             self._set_headers(200)
-            payload = {'status': 'ok', 'path': path}
+            payload = {'status': 'ok', 'path': path, 'games': games.stats(), 'tt': games.totals()}
+            if snapshots is not None:
+                payload['snapshots'] = snapshots.stats()
+            if ponderer.enabled:
+                payload['ponder'] = ponderer.stats()
+            if move_cache is not None:
+                payload['move_cache'] = move_cache.stats()
             self.wfile.write(json.dumps(payload).encode('utf-8'))
             return
 
@@ -51,37 +320,162 @@ class GameAPIHandler(BaseHTTPRequestHandler):
 
         path = self.path
 
+        if path in STREAMING_PATHS and data.get('stream'):
+            self.stream_post(path, data)
+            return
+
         try:
-            if path == '/api/tictactoe/new':
-                response = self.handle_tictactoe_new(data)
-            elif path == '/api/tictactoe/move':
-                response = self.handle_tictactoe_move(data)
-            elif path == '/api/connectfour/new':
-                response = self.handle_connectfour_new(data)
-            elif path == '/api/connectfour/move':
-                response = self.handle_connectfour_move(data)
-            elif path == '/api/chess/new':
-                response = self.handle_chess_new(data)
-            elif path == '/api/chess/move':
-                response = self.handle_chess_move(data)
-            elif path == '/api/chess/valid_moves':
-                response = self.handle_chess_valid_moves(data)
+            if path == '/api/batch':
+                response = self.handle_batch(data)
+            elif path == '/api/move_now':
+                response = self.handle_move_now(data)
             else:
-                response = {'error': 'Invalid endpoint'}
+                # lock and snapshot the game the handler will actually use
+                game_id = data.setdefault('game_id', DEFAULT_GAME_IDS.get(path))
+                with game_lock(game_id):
+                    response = self.dispatch_post(path, data)
+                    if path not in READ_ONLY_PATHS:
+                        save_game(game_id)
 
             self._set_headers()
             self.wfile.write(json.dumps(response).encode('utf-8'))
+        except BadRequest as e:
+            self._set_headers(400)
+            self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
         except Exception as e:
             self._set_headers(500)
             self.wfile.write(json.dumps({'error': str(e)}).encode('utf-8'))
 
+    def stream_post(self, path, data):
+        """Answer a move request as Server-Sent Events.
+
+        A 'progress' event (depth, best move so far, score, nodes, time) is
+        sent after every completed search depth, then a 'result' event with
+        the usual response, or an 'error' event. If the client goes away the
+        search is told to stop so that it does not run on for nobody.
+        """
+        self._set_headers(content_type='text/event-stream')
+        game_id = data.get('game_id')
+
+        def progress(info):
+            try:
+                self.send_event('progress', info)
+            except OSError:
+                ai.stop_requested = True
+
+        try:
+            with game_lock(game_id):
+                game_data = games.get(game_id)
+                ai = game_data['ai'] if game_data is not None else None
+                if ai is not None and hasattr(ai, 'on_progress'):
+                    ai.on_progress = progress
+                try:
+                    response = self.dispatch_post(path, data)
+                finally:
+                    if ai is not None and hasattr(ai, 'on_progress'):
+                        ai.on_progress = None
+                save_game(game_id)
+            self.send_event('result', response)
+        except OSError:
+            pass
+        except Exception as e:
+            self.send_event('error', {'error': str(e)})
+
+    def send_event(self, event, payload):
+        self.wfile.write(f'event: {event}\ndata: {json.dumps(payload)}\n\n'.encode('utf-8'))
+
+    def handle_move_now(self, data):
+        """Make a running search for ``game_id`` answer with its best move so far."""
+        ai = active_searches.get(data.get('game_id'))
+        if ai is None:
+            return {'stopped': False}
+        ai.stop_requested = True
+        return {'stopped': True}
+
+    def dispatch_post(self, path, data):
+        if path == '/api/tictactoe/new':
+            return self.handle_tictactoe_new(data)
+        elif path == '/api/tictactoe/move':
+            return self.handle_tictactoe_move(data)
+        elif path == '/api/connectfour/new':
+            return self.handle_connectfour_new(data)
+        elif path == '/api/connectfour/move':
+            return self.handle_connectfour_move(data)
+        elif path == '/api/chess/new':
+            return self.handle_chess_new(data)
+        elif path == '/api/chess/move':
+            return self.handle_chess_move(data)
+        elif path == '/api/chess/valid_moves':
+            return self.handle_chess_valid_moves(data)
+        else:
+            return {'error': 'Invalid endpoint'}
+
+    def handle_batch(self, data):
+        """Apply many moves in one request.
+
+        ``items`` is a list of ``{'game_id': ..., <move fields>}`` objects,
+        using the same fields as the game's /move endpoint, or
+        ``{'game_id': ..., 'moves': [<move fields>, ...]}`` to play a whole
+        sequence in one game (stopping at the first error). Items for the same
+        game are applied in order; different games are played concurrently.
+        Returns ``{'results': [...]}`` with one result per item, in order.
+        """
+        items = data.get('items', [])
+        by_game = {}
+        for index, item in enumerate(items):
+            by_game.setdefault(item.get('game_id'), []).append(index)
+
+        results = [None] * len(items)
+        futures = [batch_executor.submit(self.play_batch_items, game_id, [items[i] for i in indexes])
+                   for game_id, indexes in by_game.items()]
+        for indexes, future in zip(by_game.values(), futures):
+            try:
+                game_results = future.result()
+            except Exception as e:
+                game_results = [{'error': str(e)}] * len(indexes)
+            for index, result in zip(indexes, game_results):
+                results[index] = result
+
+        return {'results': results}
+
+    def play_batch_items(self, game_id, items):
+        results = []
+        with game_lock(game_id):
+            try:
+                for item in items:
+                    if 'moves' in item:
+                        sequence = []
+                        for move in item['moves']:
+                            result = self.play_batch_move(game_id, move)
+                            sequence.append(result)
+                            if 'error' in result:
+                                break
+                        results.append({'game_id': game_id, 'results': sequence})
+                    else:
+                        result = self.play_batch_move(game_id, item)
+                        results.append(dict(result, game_id=game_id))
+            finally:
+                # moves applied before a failure are kept, so save them too
+                save_game(game_id)
+        return results
+
+    def play_batch_move(self, game_id, move):
+        """Play one batch move; an exception becomes this move's error."""
+        game_data = games.get(game_id)
+        if game_data is None:
+            return missing_game_error(game_id)
+        try:
+            return self.dispatch_post(f"/api/{game_data['type']}/move", dict(move, game_id=game_id))
+        except Exception as e:
+            return {'error': str(e)}
+
     def handle_tictactoe_new(self, data):
-        game_id = data.get('game_id', 'ttt_1')
+        game_id = data.get('game_id', DEFAULT_GAME_IDS['/api/tictactoe/new'])
         difficulty = data.get('difficulty', 'medium')
 
         game = TicTacToe()
-        ai = TicTacToeAI(difficulty)
-        games[game_id] = {'game': game, 'ai': ai, 'type': 'tictactoe'}
+        ai = make_ai('tictactoe', difficulty, {})
+        games[game_id] = {'game': game, 'ai': ai, 'type': 'tictactoe', 'settings': {}}
 
         return {
             'game_id': game_id,
@@ -91,14 +485,15 @@ class GameAPIHandler(BaseHTTPRequestHandler):
         }
 
     def handle_tictactoe_move(self, data):
+        started = time.perf_counter()
         game_id = data.get('game_id')
         square = data.get('square')
         player_letter = data.get('player_letter', 'X')
 
-        if game_id not in games:
-            return {'error': 'Game not found'}
+        game_data = games.get(game_id)
+        if game_data is None:
+            return missing_game_error(game_id)
 
-        game_data = games[game_id]
         game = game_data['game']
         ai = game_data['ai']
 
@@ -106,30 +501,34 @@ class GameAPIHandler(BaseHTTPRequestHandler):
             return {'error': 'Invalid move'}
 
         if game.game_over():
-            return {
+            return record_move(data, 'tictactoe', ai, started, {
                 'board': game.get_board(),
                 'game_over': True,
                 'winner': game.current_winner
-            }
+            })
 
         ai_letter = 'O' if player_letter == 'X' else 'X'
-        ai_move = ai.get_move(game, ai_letter)
+        ai_move, stats = run_measured_search(ai, ai.get_move, game, ai_letter)
         game.make_move(ai_move, ai_letter)
 
-        return {
+        return record_move(data, 'tictactoe', ai, started, {
             'board': game.get_board(),
             'game_over': game.game_over(),
             'winner': game.current_winner,
             'ai_move': ai_move
-        }
+        }, stats)
 
     def handle_connectfour_new(self, data):
-        game_id = data.get('game_id', 'cf_1')
+        game_id = data.get('game_id', DEFAULT_GAME_IDS['/api/connectfour/new'])
         difficulty = data.get('difficulty', 'medium')
 
+        settings = {'tt_size_mb': requested_tt_size(data)}
+
         game = ConnectFour()
-        ai = ConnectFourAI(difficulty)
-        games[game_id] = {'game': game, 'ai': ai, 'type': 'connectfour'}
+        ai = make_ai('connectfour', difficulty, settings)
+        ponderer.stop(game_id)
+        games[game_id] = {'game': game, 'ai': ai, 'type': 'connectfour', 'ponder': bool(data.get('ponder')),
+                          'settings': settings}
 
         return {
             'game_id': game_id,
@@ -139,107 +538,149 @@ class GameAPIHandler(BaseHTTPRequestHandler):
         }
 
     def handle_connectfour_move(self, data):
+        started = time.perf_counter()
         game_id = data.get('game_id')
         col = data.get('col')
         player_letter = data.get('player_letter', 'R')
 
-        if game_id not in games:
-            return {'error': 'Game not found'}
+        game_data = games.get(game_id)
+        if game_data is None:
+            return missing_game_error(game_id)
 
-        game_data = games[game_id]
         game = game_data['game']
         ai = game_data['ai']
 
         if not game.make_move(col, player_letter):
             return {'error': 'Invalid move'}
+        ai_move = ponderer.take(game_id, connectfour_key(game))
 
         if game.game_over():
-            return {
+            return record_move(data, 'connectfour', ai, started, {
                 'board': game.get_board(),
                 'game_over': True,
                 'winner': game.current_winner
-            }
+            })
 
         ai_letter = 'Y' if player_letter == 'R' else 'R'
-        ai_move = ai.get_move(game, ai_letter)
+        pondered = ai_move is not None
+        stats = None
+        if not pondered:
+            ai_move, stats = run_game_search(game_id, ai, ai.get_move, game, ai_letter)
         game.make_move(ai_move, ai_letter)
+        if game_data.get('ponder') and not game.game_over():
+            ponderer.start(game_id, connectfour_job(game, ai, ai_letter))
 
-        return {
+        return record_move(data, 'connectfour', ai, started, {
             'board': game.get_board(),
             'game_over': game.game_over(),
             'winner': game.current_winner,
-            'ai_move': ai_move
-        }
+            'ai_move': ai_move,
+            'pondered': pondered,
+            'tt_stats': ai.tt.stats()
+        }, stats)
 
     def handle_chess_new(self, data):
-        game_id = data.get('game_id', 'chess_1')
+        game_id = data.get('game_id', DEFAULT_GAME_IDS['/api/chess/new'])
         difficulty = data.get('difficulty', 'medium')
 
+        tt_size_mb = requested_tt_size(data)
+        search_workers = data.get('search_workers', CHESS_SEARCH_WORKERS)
+        if isinstance(search_workers, bool) or not isinstance(search_workers, int):
+            raise BadRequest('search_workers must be an integer')
+        settings = {'tt_size_mb': tt_size_mb, 'search_workers': min(search_workers, CHESS_SEARCH_WORKERS)}
+
         game = Chess()
-        ai = ChessAI(difficulty)
-        games[game_id] = {'game': game, 'ai': ai, 'type': 'chess'}
+        ai = make_ai('chess', difficulty, settings)
+        ponderer.stop(game_id)
+        games[game_id] = {'game': game, 'ai': ai, 'type': 'chess', 'ponder': bool(data.get('ponder')),
+                          'settings': settings}
 
-        return {
+        response = {
             'game_id': game_id,
             'board': game.get_board(),
             'game_over': False,
             'winner': None,
             'current_turn': game.current_turn
         }
+        if data.get('move_map'):
+            response['move_map'] = chess_move_map(game)
+        return response
 
     def handle_chess_move(self, data):
+        started = time.perf_counter()
         game_id = data.get('game_id')
         from_row = data.get('from_row')
         from_col = data.get('from_col')
         to_row = data.get('to_row')
         to_col = data.get('to_col')
+        promotion = requested_promotion(data)
+        think_ms = requested_think_ms(data)
 
-        if game_id not in games:
-            return {'error': 'Game not found'}
+        game_data = games.get(game_id)
+        if game_data is None:
+            return missing_game_error(game_id)
 
-        game_data = games[game_id]
         game = game_data['game']
         ai = game_data['ai']
 
-        if not game.make_move(from_row, from_col, to_row, to_col):
+        if not game.make_move(from_row, from_col, to_row, to_col, promotion):
             return {'error': 'Invalid move'}
+        ai_move = ponderer.take(game_id, game.zobrist_key)
 
         if game.game_over():
-            return {
+            response = {
                 'board': game.get_board(),
                 'game_over': True,
                 'winner': game.current_winner,
                 'current_turn': game.current_turn
             }
+            stats = None
+        else:
+            pondered = ai_move is not None
+            stats = None
+            if not pondered:
+                ai_move, stats = run_game_search(game_id, ai, ai.get_move, game, False, think_ms)
+            if ai_move:
+                game.make_move(*ai_move)
+            if game_data.get('ponder') and not game.game_over():
+                ponderer.start(game_id, chess_job(game, ai, False, think_ms))
+            response = {
+                'board': game.get_board(),
+                'game_over': game.game_over(),
+                'winner': game.current_winner,
+                'current_turn': game.current_turn,
+                'ai_move': ai_move,
+                'pondered': pondered,
+                'search_depth': None if pondered else ai.completed_depth,
+                'tt_stats': ai.tt.stats()
+            }
 
-        ai_move = ai.get_move(game, False)
-        if ai_move:
-            game.make_move(ai_move[0], ai_move[1], ai_move[2], ai_move[3])
-
-        return {
-            'board': game.get_board(),
-            'game_over': game.game_over(),
-            'winner': game.current_winner,
-            'current_turn': game.current_turn,
-            'ai_move': ai_move
-        }
+        if data.get('move_map'):
+            response['move_map'] = chess_move_map(game)
+        return record_move(data, 'chess', ai, started, response, stats)
 
     def handle_chess_valid_moves(self, data):
         game_id = data.get('game_id')
         row = data.get('row')
         col = data.get('col')
 
-        if game_id not in games:
-            return {'error': 'Game not found'}
+        game_data = games.get(game_id)
+        if game_data is None:
+            return missing_game_error(game_id)
 
-        game = games[game_id]['game']
+        game = game_data['game']
         valid_moves = game.get_valid_moves(row, col)
 
         return {'valid_moves': valid_moves}
 
+class GameHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 makes bursts of clients wait for a SYN retry
+    request_queue_size = 128
+
 def run_server(port=8001):
     server_address = ('', port)
-    httpd = HTTPServer(server_address, GameAPIHandler)
+    httpd = GameHTTPServer(server_address, GameAPIHandler)
     print(f'Starting game server on port {port}...')
     # Use a request-handling loop that recovers from malformed connections
     # (for example when an HTTPS/TLS client connects to an HTTP server).
@@ -266,6 +707,9 @@ def run_server(port=8001):
         print('\nShutting down server (keyboard interrupt)')
     finally:
         httpd.server_close()
+        batch_executor.shutdown(wait=False, cancel_futures=True)
+        search_executor.shutdown(wait=False, cancel_futures=True)
+        shutdown_search_pools()
 
 if __name__ == '__main__':
     port = int(sys.argv[1]) if len(sys.argv) > 1 else 8001
@@ -0,0 +1,92 @@
+"""Perft-style benchmark for the Connect Four position representation.
+
+Counts the positions reachable in N plies from the empty board (games stop
+at a win) with the bitboard ConnectFour and with the original 6x7
+list-of-lists representation, and reports nodes per second for each.
+Run from the game_engine directory:
+
+    python bench_connectfour.py
+"""
+import time
+
+from connectfour import ConnectFour
+
+
+class ListConnectFour:
+    """The original list-of-lists board, kept here as the baseline."""
+
+    def __init__(self):
+        self.rows = 6
+        self.cols = 7
+        self.board = [[' ' for _ in range(self.cols)] for _ in range(self.rows)]
+        self.current_winner = None
+
+    def get_next_open_row(self, col):
+        for r in range(self.rows - 1, -1, -1):
+            if self.board[r][col] == ' ':
+                return r
+        return None
+
+    def check_winner(self, row, col, letter):
+        def check_direction(dr, dc):
+            count = 1
+            for direction in [1, -1]:
+                r, c = row + dr * direction, col + dc * direction
+                while 0 <= r < self.rows and 0 <= c < self.cols and self.board[r][c] == letter:
+                    count += 1
+                    r += dr * direction
+                    c += dc * direction
+            return count >= 4
+
+        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
+        return any(check_direction(dr, dc) for dr, dc in directions)
+
+    def available_moves(self):
+        return [col for col in range(self.cols) if self.board[0][col] == ' ']
+
+
+def perft_list(game, depth, letter):
+    if depth == 0:
+        return 1
+    nodes = 0
+    other = 'Y' if letter == 'R' else 'R'
+    for col in game.available_moves():
+        row = game.get_next_open_row(col)
+        game.board[row][col] = letter
+        if game.check_winner(row, col, letter):
+            nodes += 1
+        else:
+            nodes += perft_list(game, depth - 1, other)
+        game.board[row][col] = ' '
+    return nodes
+
+
+def perft_bitboard(game, depth, letter):
+    if depth == 0:
+        return 1
+    nodes = 0
+    other = 'Y' if letter == 'R' else 'R'
+    for col in game.available_moves():
+        game.drop(col, letter)
+        if game.current_winner is not None:
+            nodes += 1
+        else:
+            nodes += perft_bitboard(game, depth - 1, other)
+        game.lift(col)
+    return nodes
+
+
+def bench(depth=6):
+    results = []
+    for name, factory, perft in (('list', ListConnectFour, perft_list),
+                                 ('bitboard', ConnectFour, perft_bitboard)):
+        start = time.perf_counter()
+        nodes = perft(factory(), depth, 'R')
+        elapsed = time.perf_counter() - start
+        results.append(nodes)
+        print(f'{name:10s} depth {depth}  {nodes:9d} nodes  {elapsed * 1000:9.1f} ms  {nodes / elapsed:10.0f} nps')
+    assert results[0] == results[1], 'representations disagree'
+
+
+if __name__ == '__main__':
+    bench()
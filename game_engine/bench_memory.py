@@ -0,0 +1,74 @@
+"""Memory benchmark: bytes per idle game for each game type.
+
+Creates many games the way the API does (game, AI and store entry), plays
+one move each way, then lets the store trim them as idle. Reports traced
+allocations per game for a fresh game, right after a move (search tables
+still held) and once idle. Run from the game_engine directory:
+
+    python bench_memory.py [games]
+"""
+import gc
+import random
+import sys
+import tracemalloc
+
+from chess import Chess, ChessAI
+from connectfour import ConnectFour, ConnectFourAI
+from game_store import GameStore
+from tictactoe import TicTacToe, TicTacToeAI, load_solved_table
+
+
+def play_tictactoe(game, ai):
+    game.make_move(4, 'X')
+    game.make_move(ai.get_move(game, 'O'), 'O')
+
+
+def play_connectfour(game, ai):
+    game.make_move(3, 'R')
+    game.make_move(ai.get_move(game, 'Y'), 'Y')
+
+
+def play_chess(game, ai):
+    game.make_move(6, 4, 4, 4)
+    game.push(ai.minimax_move(game, False, 2))
+
+
+GAME_TYPES = (
+    ('tictactoe', TicTacToe, TicTacToeAI, play_tictactoe),
+    ('connectfour', ConnectFour, ConnectFourAI, play_connectfour),
+    ('chess', Chess, ChessAI, play_chess),
+)
+
+
+def traced():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def bench(count=2000, difficulty='medium'):
+    random.seed(0)
+    load_solved_table()
+    for name, game_class, ai_class, play in GAME_TYPES:
+        clock = [0.0]
+        store = GameStore(max_games=count, idle_ttl=None, clock=lambda: clock[0], trim_after=60)
+
+        tracemalloc.start()
+        base = traced()
+        for i in range(count):
+            store.put(f'{name}_{i}', {'game': game_class(), 'ai': ai_class(difficulty), 'type': name})
+        fresh = traced()
+        for game_data in store.values():
+            play(game_data['game'], game_data['ai'])
+        played = traced()
+        clock[0] += 120
+        store.sweep()
+        idle = traced()
+        tracemalloc.stop()
+
+        print(f'{name:12s} fresh {(fresh - base) / count:8.0f} B/game  '
+              f'after move {(played - base) / count:8.0f} B/game  '
+              f'idle {(idle - base) / count:8.0f} B/game')
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
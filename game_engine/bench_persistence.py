@@ -0,0 +1,109 @@
+"""Persistence benchmark: snapshot write cost and restart time.
+
+Saves a mix of chess, Connect Four and TicTacToe games to a fresh SQLite
+file through GameSnapshots, then reports:
+
+- bulk save time and write amplification (file size including the WAL
+  against the logical snapshot bytes),
+- how many row writes a burst of repeated moves costs once coalesced,
+- time to reopen the file (server start-up) and the latency of restoring
+  one game on first access.
+
+Run from the game_engine directory:
+
+    python bench_persistence.py [games]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from chess import Chess
+from connectfour import ConnectFour
+from persistence import GameSnapshots
+from tictactoe import TicTacToe
+
+GAME_CLASSES = {'tictactoe': TicTacToe, 'connectfour': ConnectFour, 'chess': Chess}
+
+
+def random_state(game_type, rng):
+    game = GAME_CLASSES[game_type]()
+    if game_type == 'chess':
+        for _ in range(rng.randrange(20)):
+            moves = game.get_all_valid_moves_for_color(game.current_turn == 'white')
+            if not moves or game.game_over():
+                break
+            game.push(rng.choice(moves))
+    elif game_type == 'connectfour':
+        for i in range(rng.randrange(20)):
+            moves = game.available_moves()
+            if not moves or game.game_over():
+                break
+            game.make_move(rng.choice(moves), 'RY'[i % 2])
+    else:
+        for i in range(rng.randrange(5)):
+            game.make_move(rng.choice(game.available_moves()), 'XO'[i % 2])
+    return game.to_state()
+
+
+def file_bytes(path):
+    return sum(os.path.getsize(path + suffix) for suffix in ('', '-wal', '-shm') if os.path.exists(path + suffix))
+
+
+def bench(count=100000):
+    rng = random.Random(0)
+    types = list(GAME_CLASSES)
+    # a pool of distinct positions keeps set-up time out of the measurement
+    states = {game_type: [random_state(game_type, rng) for _ in range(200)] for game_type in types}
+    games = [(f'game_{i}', types[i % len(types)]) for i in range(count)]
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'games.sqlite3')
+
+    snapshots = GameSnapshots(path, flush_interval=3600)
+    start = time.perf_counter()
+    for game_id, game_type in games:
+        snapshots.save(game_id, game_type, 'medium', rng.choice(states[game_type]))
+    snapshots.flush()
+    elapsed = time.perf_counter() - start
+    logical = snapshots.bytes_written
+    print(f'saved {count} games in {elapsed:.2f}s ({count / elapsed:,.0f} games/s), '
+          f'{snapshots.batches} batch(es)')
+    print(f'logical {logical / count:.0f} B/game, on disk {file_bytes(path) / count:.0f} B/game, '
+          f'write amplification {file_bytes(path) / logical:.2f}x')
+
+    # ten moves in each of 1000 games between two flushes
+    written = snapshots.rows_written
+    start = time.perf_counter()
+    for _ in range(10):
+        for game_id, game_type in games[:1000]:
+            snapshots.save(game_id, game_type, 'medium', rng.choice(states[game_type]))
+    snapshots.flush()
+    elapsed = time.perf_counter() - start
+    print(f'10000 updates to 1000 games: {snapshots.rows_written - written} row writes in {elapsed * 1000:.1f}ms')
+    snapshots.close()
+
+    start = time.perf_counter()
+    snapshots = GameSnapshots(path)
+    opened = time.perf_counter() - start
+    print(f'reopen with {snapshots.count()} games stored: {opened * 1000:.1f}ms')
+
+    latencies = []
+    for game_id, game_type in rng.sample(games, 1000):
+        start = time.perf_counter()
+        stored_type, difficulty, state, settings = snapshots.load(game_id)
+        GAME_CLASSES[stored_type].from_state(state)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(f'restore on first access: median {latencies[500] * 1e6:.0f}us, p99 {latencies[990] * 1e6:.0f}us')
+    snapshots.close()
+
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,251 @@
+"""Benchmark suite for all three engines, comparable between commits.
+
+Three parts:
+
+- perft: leaf counts and time for move generation from fixed positions;
+  chess uses the standard perft positions and must match their published
+  counts,
+- search: time and nodes for each ``*AI.get_move`` at every difficulty,
+  seeded and run with a fresh AI each time, chess with an unbounded time
+  budget so the depth (and node count) is fixed by the difficulty,
+- http: end-to-end latency of the API handlers through an in-process
+  server (persistence disabled).
+
+Timings are the median of several repeats. Results are compared against
+``bench_baseline.json``; perft and search node counts must match exactly,
+times are shown as a ratio to the baseline. Run from the game_engine
+directory:
+
+    python bench_suite.py [--quick] [--output results.json] [--save-baseline]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import threading
+import time
+import urllib.request
+
+os.environ.setdefault('GAME_SNAPSHOT_PATH', '')
+
+from bench_chess import POSITIONS, load_position
+from bench_connectfour import perft_bitboard
+from chess import Chess, ChessAI, ChessAIConfig, CHESS_AI_CONFIGS
+from connectfour import ConnectFour, ConnectFourAI
+from tictactoe import TicTacToe, TicTacToeAI, load_solved_table
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+
+
+def timed(func, repeat):
+    """Run ``func`` ``repeat`` times; return (median seconds, last result)."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+# Standard perft positions with their published leaf counts by depth.
+CHESS_PERFT = {
+    'start': ('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1', (20, 400, 8902, 197281)),
+    'kiwipete': ('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1', (48, 2039, 97862, 4085603)),
+    'position3': ('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', (14, 191, 2812, 43238)),
+    'position4': ('r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1', (6, 264, 9467, 422333)),
+    'position5': ('rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8', (44, 1486, 62379, 2103487)),
+}
+
+
+def perft_chess(game, depth):
+    moves = game.get_all_valid_moves_for_color(game.current_turn == 'white')
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        game.push(move)
+        nodes += perft_chess(game, depth - 1)
+        game.pop()
+    return nodes
+
+
+def perft_tictactoe(game, depth, letter):
+    if depth == 0:
+        return 1
+    nodes = 0
+    other = 'O' if letter == 'X' else 'X'
+    for square in game.available_moves():
+        game.make_move(square, letter)
+        if game.current_winner is not None:
+            nodes += 1
+        else:
+            nodes += perft_tictactoe(game, depth - 1, other)
+        game.board[square] = ' '
+        game.current_winner = None
+    return nodes
+
+
+def bench_perft(quick, repeat):
+    cases = [
+        ('tictactoe/empty/9', lambda: perft_tictactoe(TicTacToe(), 9, 'X')),
+        ('connectfour/empty/%d' % (5 if quick else 7), lambda: perft_bitboard(ConnectFour(), 5 if quick else 7, 'R')),
+    ]
+    chess_depth = 2 if quick else 3
+    for name, (fen, _) in CHESS_PERFT.items():
+        cases.append((f'chess/{name}/{chess_depth}', lambda fen=fen: perft_chess(Chess.from_fen(fen), chess_depth)))
+
+    results = {}
+    for name, func in cases:
+        seconds, nodes = timed(func, repeat)
+        results[name] = {'nodes': nodes, 'ms': round(seconds * 1000, 2)}
+        if name.startswith('chess/'):
+            expected = CHESS_PERFT[name.split('/')[1]][1][chess_depth - 1]
+            if nodes != expected:
+                raise SystemExit(f'perft {name}: {nodes} leaves, expected {expected}')
+    return results
+
+
+def search_cases(quick):
+    difficulties = ('easy', 'medium') if quick else ('easy', 'medium', 'hard')
+    cases = []
+    for difficulty in difficulties:
+        def tictactoe(difficulty=difficulty):
+            game = TicTacToe()
+            game.make_move(4, 'X')
+            ai = TicTacToeAI(difficulty, use_solved_table=False)
+            ai.get_move(game, 'O')
+            return None
+        cases.append((f'tictactoe/{difficulty}', tictactoe))
+
+        def connectfour(difficulty=difficulty):
+            game = ConnectFour()
+            for col, letter in ((3, 'R'), (3, 'Y'), (2, 'R'), (4, 'Y')):
+                game.make_move(col, letter)
+            ai = ConnectFourAI(difficulty)
+            ai.get_move(game, 'R')
+            return ai.nodes
+        cases.append((f'connectfour/{difficulty}', connectfour))
+
+        for position in ('start', 'middlegame'):
+            def chess(difficulty=difficulty, position=position):
+                game = load_position(POSITIONS[position])
+                defaults = CHESS_AI_CONFIGS[difficulty]
+                # measure the search itself, not the opening book
+                ai = ChessAI(config=ChessAIConfig(difficulty, defaults.max_depth, defaults.think_ms, use_book=False))
+                ai.get_move(game, True, think_ms=10 ** 9)
+                return ai.nodes
+            cases.append((f'chess/{position}/{difficulty}', chess))
+    return cases
+
+
+def bench_search(quick, repeat):
+    load_solved_table()
+    results = {}
+    for name, func in search_cases(quick):
+        def seeded(func=func):
+            random.seed(0)
+            return func()
+        seconds, nodes = timed(seeded, repeat)
+        results[name] = {'nodes': nodes, 'ms': round(seconds * 1000, 2)}
+    return results
+
+
+def bench_http(quick, repeat):
+    import api
+
+    server = api.GameHTTPServer(('127.0.0.1', 0), api.GameAPIHandler)
+    port = server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def post(path, payload):
+        request = urllib.request.Request(f'http://127.0.0.1:{port}{path}', data=json.dumps(payload).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+    def get(path):
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}') as response:
+            return json.loads(response.read())
+
+    counter = iter(range(10 ** 9))
+
+    def new_and_move(game_type, move):
+        def run():
+            game_id = f'bench_{game_type}_{next(counter)}'
+            post(f'/api/{game_type}/new', {'game_id': game_id, 'difficulty': 'easy'})
+            post(f'/api/{game_type}/move', dict(move, game_id=game_id))
+        return run
+
+    cases = [
+        ('health', lambda: get('/api/health')),
+        ('tictactoe/new+move', new_and_move('tictactoe', {'square': 4})),
+        ('connectfour/new+move', new_and_move('connectfour', {'col': 3})),
+        ('chess/new+move', new_and_move('chess', {'from_row': 6, 'from_col': 4, 'to_row': 4, 'to_col': 4})),
+    ]
+    requests = 50 if quick else 200
+    results = {}
+    try:
+        for name, func in cases:
+            random.seed(0)
+            func()
+            seconds, _ = timed(lambda: [func() for _ in range(requests)], repeat)
+            results[name] = {'ms': round(seconds * 1000 / requests, 3)}
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def compare(results, baseline):
+    failed = False
+    for part, cases in results.items():
+        print(f'== {part}')
+        for name, result in cases.items():
+            base = baseline.get(part, {}).get(name)
+            line = f'  {name:28s} {result["ms"]:10.2f} ms'
+            if result.get('nodes') is not None:
+                line += f'  {result["nodes"]:10d} nodes'
+            if base:
+                line += f'  x{result["ms"] / base["ms"]:.2f} vs baseline' if base['ms'] else ''
+                if base.get('nodes') != result.get('nodes'):
+                    line += f'  NODES CHANGED (baseline {base.get("nodes")})'
+                    failed = True
+            print(line)
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Perft, search and HTTP benchmarks.')
+    parser.add_argument('--quick', action='store_true', help='smaller depths for a fast check')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='overwrite the baseline with these results')
+    args = parser.parse_args()
+
+    results = {
+        'perft': bench_perft(args.quick, args.repeat),
+        'search': bench_search(args.quick, args.repeat),
+        'http': bench_http(args.quick, args.repeat),
+    }
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    ok = compare(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+    elif not ok:
+        raise SystemExit('node counts differ from the baseline')
+
+
+if __name__ == '__main__':
+    main()
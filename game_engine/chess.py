@@ -1,12 +1,275 @@
 import random
 import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from opening_book import BOOK_PATH, OpeningBook
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+# Squares are numbered 0..63 in row-major order matching Chess.board, so
+# square 0 is row 0 / col 0 (black's queen-side rook) and bit n of every
+# bitboard corresponds to board[n // 8][n % 8].
+FULL_BOARD = (1 << 64) - 1
+FILE_A = sum(1 << (row * 8) for row in range(8))
+FILE_H = FILE_A << 7
+NOT_FILE_A = FULL_BOARD ^ FILE_A
+NOT_FILE_H = FULL_BOARD ^ FILE_H
+
+WHITE_PIECES = 'PNBRQK'
+BLACK_PIECES = 'pnbrqk'
+
+# Material from white's point of view; kept up to date by Chess.set_piece so
+# the search can read the score of a position without scanning the board.
+PIECE_VALUES = {
+    'P': 10, 'N': 30, 'B': 30, 'R': 50, 'Q': 90, 'K': 900,
+    'p': -10, 'n': -30, 'b': -30, 'r': -50, 'q': -90, 'k': -900,
+    ' ': 0
+}
+
+# Zobrist keys come from a fixed seed so that a position hashes to the same
+# value in every process (worker pools and on-disk tables rely on this).
+_zobrist_random = random.Random(0x5A0B1157)
+ZOBRIST_PIECES = {
+    piece: [_zobrist_random.getrandbits(64) for _ in range(64)]
+    for piece in WHITE_PIECES + BLACK_PIECES
+}
+ZOBRIST_BLACK_TO_MOVE = _zobrist_random.getrandbits(64)
+ZOBRIST_CASTLING = [_zobrist_random.getrandbits(64) for _ in range(16)]
+ZOBRIST_EN_PASSANT = [_zobrist_random.getrandbits(64) for _ in range(8)]
+
+# Castling rights are a 4-bit mask. Moving from or capturing on one of these
+# squares (a king or rook home square) clears the rights listed for it.
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+CASTLING_LETTERS = (('K', WHITE_KINGSIDE), ('Q', WHITE_QUEENSIDE), ('k', BLACK_KINGSIDE), ('q', BLACK_QUEENSIDE))
+CASTLING_CLEARED_BY = [0] * 64
+CASTLING_CLEARED_BY[60] = WHITE_KINGSIDE | WHITE_QUEENSIDE
+CASTLING_CLEARED_BY[63] = WHITE_KINGSIDE
+CASTLING_CLEARED_BY[56] = WHITE_QUEENSIDE
+CASTLING_CLEARED_BY[4] = BLACK_KINGSIDE | BLACK_QUEENSIDE
+CASTLING_CLEARED_BY[7] = BLACK_KINGSIDE
+CASTLING_CLEARED_BY[0] = BLACK_QUEENSIDE
+
+# Pieces a pawn may promote to, best first.
+PROMOTIONS = {True: 'QRBN', False: 'qrbn'}
+
+
+def _step_attacks(offsets):
+    table = []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        attacks = 0
+        for dr, dc in offsets:
+            r, c = row + dr, col + dc
+            if 0 <= r < 8 and 0 <= c < 8:
+                attacks |= 1 << (r * 8 + c)
+        table.append(attacks)
+    return table
+
+
+KNIGHT_ATTACKS = _step_attacks([(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)])
+KING_ATTACKS = _step_attacks([(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)])
+
+
+def _ray(sq, dr, dc):
+    row, col = divmod(sq, 8)
+    squares = []
+    r, c = row + dr, col + dc
+    while 0 <= r < 8 and 0 <= c < 8:
+        squares.append(r * 8 + c)
+        r, c = r + dr, c + dc
+    return squares
+
+
+def _line_tables(directions):
+    """Occupancy-indexed attack tables for one line through every square.
+
+    For each square the relevant blocker mask excludes the square itself and
+    the last square of each ray (a blocker there cannot shorten the ray), so
+    a line has at most 2**6 occupancy subsets. This is the same idea as magic
+    bitboards, with a dict standing in for the magic multiply-and-shift.
+    """
+    masks = []
+    tables = []
+    for sq in range(64):
+        rays = [_ray(sq, dr, dc) for dr, dc in directions]
+        mask = 0
+        for ray in rays:
+            for target in ray[:-1]:
+                mask |= 1 << target
+
+        table = {}
+        subset = 0
+        while True:
+            attacks = 0
+            for ray in rays:
+                for target in ray:
+                    attacks |= 1 << target
+                    if subset & (1 << target):
+                        break
+            table[subset] = attacks
+            subset = (subset - mask) & mask
+            if subset == 0:
+                break
+
+        masks.append(mask)
+        tables.append(table)
+    return masks, tables
+
+
+RANK_MASKS, RANK_ATTACKS = _line_tables([(0, 1), (0, -1)])
+FILE_MASKS, FILE_ATTACKS = _line_tables([(1, 0), (-1, 0)])
+DIAG_MASKS, DIAG_ATTACKS = _line_tables([(1, 1), (-1, -1)])
+ANTI_DIAG_MASKS, ANTI_DIAG_ATTACKS = _line_tables([(1, -1), (-1, 1)])
+
+
+def rook_attacks(sq, occupied):
+    return (RANK_ATTACKS[sq][occupied & RANK_MASKS[sq]] |
+            FILE_ATTACKS[sq][occupied & FILE_MASKS[sq]])
+
+
+def bishop_attacks(sq, occupied):
+    return (DIAG_ATTACKS[sq][occupied & DIAG_MASKS[sq]] |
+            ANTI_DIAG_ATTACKS[sq][occupied & ANTI_DIAG_MASKS[sq]])
+
+
+def _between_table():
+    """``BETWEEN[a][b]``: squares strictly between two squares on a line, else 0."""
+    table = [[0] * 64 for _ in range(64)]
+    for sq in range(64):
+        for dr, dc in ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)):
+            between = 0
+            for target in _ray(sq, dr, dc):
+                table[sq][target] = between
+                between |= 1 << target
+    return table
+
+
+BETWEEN = _between_table()
+# Rook and bishop lines from each square on an empty board, for finding pins.
+ROOK_RAYS = [rook_attacks(sq, 0) for sq in range(64)]
+BISHOP_RAYS = [bishop_attacks(sq, 0) for sq in range(64)]
+
+
+def iter_squares(bb):
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+
+class BoardRow:
+    """A writable view of one rank of a Chess position."""
+
+    __slots__ = ('_game', '_row')
+
+    def __init__(self, game, row):
+        self._game = game
+        self._row = row
+
+    def __getitem__(self, col):
+        if isinstance(col, slice):
+            return list(self)[col]
+        return self._game.squares[self._row * 8 + col]
+
+    def __setitem__(self, col, piece):
+        self._game.set_piece(self._row, col, piece)
+
+    def __iter__(self):
+        start = self._row * 8
+        return iter(self._game.squares[start:start + 8])
+
+    def __len__(self):
+        return 8
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class BoardView:
+    """List-of-lists style access to the bitboard position.
+
+    ``board[row][col]`` reads and writes go straight to the underlying
+    bitboards, so code written against the original 8x8 list keeps working.
+    """
+
+    __slots__ = ('_game',)
+
+    def __init__(self, game):
+        self._game = game
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [BoardRow(self._game, r) for r in range(8)][row]
+        return BoardRow(self._game, row)
+
+    def __iter__(self):
+        return (BoardRow(self._game, row) for row in range(8))
+
+    def __len__(self):
+        return 8
+
+    def __eq__(self, other):
+        return [list(row) for row in self] == [list(row) for row in other]
+
+    def __repr__(self):
+        return repr([list(row) for row in self])
+
 
 class Chess:
+    __slots__ = ('bitboards', 'squares', 'white_occupied', 'black_occupied', 'material',
+                 'piece_key', 'castling', 'en_passant', 'move_stack', 'current_winner', 'current_turn',
+                 '_move_map')
+
     def __init__(self):
+        self.bitboards = {piece: 0 for piece in WHITE_PIECES + BLACK_PIECES}
+        self.squares = [' '] * 64
+        self.white_occupied = 0
+        self.black_occupied = 0
+        self.material = 0
+        self.piece_key = 0
+        self.move_stack = []
         self.board = self.initialize_board()
         self.current_winner = None
         self.current_turn = 'white'
 
+    @property
+    def board(self):
+        return BoardView(self)
+
+    @board.setter
+    def board(self, rows):
+        for piece in self.bitboards:
+            self.bitboards[piece] = 0
+        self.squares = [' '] * 64
+        self.white_occupied = 0
+        self.black_occupied = 0
+        self.material = 0
+        self.piece_key = 0
+        for row in range(8):
+            for col in range(8):
+                piece = rows[row][col]
+                if piece != ' ':
+                    self.set_piece(row, col, piece)
+        self.castling = self.infer_castling()
+        self.en_passant = None
+        self._move_map = None
+
+    def infer_castling(self):
+        """Castling rights for every king and rook still on its home square."""
+        squares = self.squares
+        rights = 0
+        if squares[60] == 'K':
+            rights |= (WHITE_KINGSIDE if squares[63] == 'R' else 0) | (WHITE_QUEENSIDE if squares[56] == 'R' else 0)
+        if squares[4] == 'k':
+            rights |= (BLACK_KINGSIDE if squares[7] == 'r' else 0) | (BLACK_QUEENSIDE if squares[0] == 'r' else 0)
+        return rights
+
     def initialize_board(self):
         board = [[' ' for _ in range(8)] for _ in range(8)]
 
@@ -19,13 +282,90 @@ class Chess:
 
         return board
 
+    def to_state(self):
+        """Compact, JSON-safe snapshot of the position (no move history).
+
+        The board is the 64 squares in row-major order as one string.
+        """
+        return {
+            'board': ''.join(self.squares),
+            'current_turn': self.current_turn,
+            'current_winner': self.current_winner,
+            'castling': ''.join(letter for letter, right in CASTLING_LETTERS if self.castling & right) or '-',
+            'en_passant': self.en_passant
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        game = cls()
+        squares = state['board']
+        game.board = [squares[row * 8:row * 8 + 8] for row in range(8)]
+        game.current_turn = state['current_turn']
+        game.current_winner = state['current_winner']
+        # snapshots written before castling was tracked fall back to inference
+        if 'castling' in state:
+            game.castling = sum(right for letter, right in CASTLING_LETTERS if letter in state['castling'])
+            game.en_passant = state['en_passant']
+        return game
+
+    @classmethod
+    def from_fen(cls, fen):
+        """Position from Forsyth-Edwards Notation (move counters are ignored)."""
+        placement, turn, castling, en_passant = fen.split()[:4]
+        rows = []
+        for rank in placement.split('/'):
+            row = ''
+            for char in rank:
+                row += ' ' * int(char) if char.isdigit() else char
+            rows.append(row)
+        game = cls()
+        game.board = rows
+        game.current_turn = 'white' if turn == 'w' else 'black'
+        game.castling = sum(right for letter, right in CASTLING_LETTERS if letter in castling)
+        if en_passant != '-':
+            game.en_passant = (8 - int(en_passant[1])) * 8 + ord(en_passant[0]) - ord('a')
+        return game
+
     def reset(self):
         self.board = self.initialize_board()
+        self.move_stack = []
         self.current_winner = None
         self.current_turn = 'white'
 
+    @property
+    def zobrist_key(self):
+        """64-bit hash of the piece placement, side to move, castling rights
+        and en passant file."""
+        key = self.piece_key ^ ZOBRIST_CASTLING[self.castling]
+        if self.en_passant is not None:
+            key ^= ZOBRIST_EN_PASSANT[self.en_passant & 7]
+        if self.current_turn == 'black':
+            return key ^ ZOBRIST_BLACK_TO_MOVE
+        return key
+
     def get_board(self):
-        return self.board
+        return [self.squares[row * 8:row * 8 + 8] for row in range(8)]
+
+    def set_piece(self, row, col, piece):
+        sq = row * 8 + col
+        bit = 1 << sq
+        old = self.squares[sq]
+        self.material += PIECE_VALUES[piece] - PIECE_VALUES[old]
+        if old != ' ':
+            self.piece_key ^= ZOBRIST_PIECES[old][sq]
+            self.bitboards[old] ^= bit
+            if old.isupper():
+                self.white_occupied ^= bit
+            else:
+                self.black_occupied ^= bit
+        self.squares[sq] = piece
+        if piece != ' ':
+            self.piece_key ^= ZOBRIST_PIECES[piece][sq]
+            self.bitboards[piece] |= bit
+            if piece.isupper():
+                self.white_occupied |= bit
+            else:
+                self.black_occupied |= bit
 
     def is_white_piece(self, piece):
         return piece.isupper()
@@ -33,127 +373,49 @@ class Chess:
     def is_black_piece(self, piece):
         return piece.islower()
 
+    def move_map(self):
+        """Legal destinations of every piece of the side to move, as
+        ``{(row, col): [(to_row, to_col), ...]}``.
+
+        The map is kept until the position changes, so repeated lookups on
+        the same board (a player clicking through their pieces) cost a dict
+        access.
+        """
+        key = self.zobrist_key
+        if self._move_map is None or self._move_map[0] != key:
+            targets = {}
+            for move in self.get_all_valid_moves_for_color(self.current_turn == 'white'):
+                square_targets = targets.setdefault((move[0], move[1]), [])
+                if (move[2], move[3]) not in square_targets:
+                    square_targets.append((move[2], move[3]))
+            self._move_map = (key, targets)
+        return self._move_map[1]
+
     def get_valid_moves(self, row, col):
-        piece = self.board[row][col]
+        piece = self.squares[row * 8 + col]
         if piece == ' ':
             return []
-
-        is_white = self.is_white_piece(piece)
-        piece_type = piece.upper()
-
-        moves = []
-
-        if piece_type == 'P':
-            moves = self.get_pawn_moves(row, col, is_white)
-        elif piece_type == 'R':
-            moves = self.get_rook_moves(row, col, is_white)
-        elif piece_type == 'N':
-            moves = self.get_knight_moves(row, col, is_white)
-        elif piece_type == 'B':
-            moves = self.get_bishop_moves(row, col, is_white)
-        elif piece_type == 'Q':
-            moves = self.get_queen_moves(row, col, is_white)
-        elif piece_type == 'K':
-            moves = self.get_king_moves(row, col, is_white)
-
-        return moves
-
-    def get_pawn_moves(self, row, col, is_white):
-        moves = []
-        direction = -1 if is_white else 1
-        start_row = 6 if is_white else 1
-
-        new_row = row + direction
-        if 0 <= new_row < 8 and self.board[new_row][col] == ' ':
-            moves.append((new_row, col))
-
-            if row == start_row:
-                new_row2 = row + 2 * direction
-                if self.board[new_row2][col] == ' ':
-                    moves.append((new_row2, col))
-
-        for dc in [-1, 1]:
-            new_row, new_col = row + direction, col + dc
-            if 0 <= new_row < 8 and 0 <= new_col < 8:
-                target = self.board[new_row][new_col]
-                if target != ' ' and self.is_white_piece(target) != is_white:
-                    moves.append((new_row, new_col))
-
-        return moves
-
-    def get_rook_moves(self, row, col, is_white):
-        moves = []
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-
-        for dr, dc in directions:
-            for i in range(1, 8):
-                new_row, new_col = row + dr * i, col + dc * i
-                if not (0 <= new_row < 8 and 0 <= new_col < 8):
-                    break
-
-                target = self.board[new_row][new_col]
-                if target == ' ':
-                    moves.append((new_row, new_col))
-                elif self.is_white_piece(target) != is_white:
-                    moves.append((new_row, new_col))
-                    break
-                else:
-                    break
-
-        return moves
-
-    def get_knight_moves(self, row, col, is_white):
-        moves = []
-        knight_moves = [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)]
-
-        for dr, dc in knight_moves:
-            new_row, new_col = row + dr, col + dc
-            if 0 <= new_row < 8 and 0 <= new_col < 8:
-                target = self.board[new_row][new_col]
-                if target == ' ' or self.is_white_piece(target) != is_white:
-                    moves.append((new_row, new_col))
-
-        return moves
-
-    def get_bishop_moves(self, row, col, is_white):
-        moves = []
-        directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-
-        for dr, dc in directions:
-            for i in range(1, 8):
-                new_row, new_col = row + dr * i, col + dc * i
-                if not (0 <= new_row < 8 and 0 <= new_col < 8):
-                    break
-
-                target = self.board[new_row][new_col]
-                if target == ' ':
-                    moves.append((new_row, new_col))
-                elif self.is_white_piece(target) != is_white:
-                    moves.append((new_row, new_col))
-                    break
-                else:
-                    break
-
-        return moves
-
-    def get_queen_moves(self, row, col, is_white):
-        return self.get_rook_moves(row, col, is_white) + self.get_bishop_moves(row, col, is_white)
-
-    def get_king_moves(self, row, col, is_white):
-        moves = []
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
-
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            if 0 <= new_row < 8 and 0 <= new_col < 8:
-                target = self.board[new_row][new_col]
-                if target == ' ' or self.is_white_piece(target) != is_white:
-                    moves.append((new_row, new_col))
-
-        return moves
-
-    def make_move(self, from_row, from_col, to_row, to_col):
-        piece = self.board[from_row][from_col]
+        if piece.isupper() == (self.current_turn == 'white'):
+            return list(self.move_map().get((row, col), ()))
+        targets = []
+        for move in self.get_all_valid_moves_for_color(piece.isupper()):
+            if move[0] == row and move[1] == col and (move[2], move[3]) not in targets:
+                targets.append((move[2], move[3]))
+        return targets
+
+    def make_move(self, from_row, from_col, to_row, to_col, promotion=None):
+        """Play a legal move for the side to move; False if it is not legal.
+
+        A pawn reaching the last rank becomes a queen unless ``promotion``
+        names another piece ('R', 'B' or 'N'); ``promotion`` is ignored for
+        other moves, but any value other than those letters (or 'Q') makes
+        the move illegal. Afterwards checkmate and stalemate end the game
+        (``current_winner`` is the winner or 'draw').
+        """
+        if promotion is not None and (not isinstance(promotion, str) or len(promotion) != 1
+                                      or promotion.upper() not in PROMOTIONS[True]):
+            return False
+        piece = self.squares[from_row * 8 + from_col]
 
         if piece == ' ':
             return False
@@ -162,140 +424,1001 @@ class Chess:
         if (is_white and self.current_turn != 'white') or (not is_white and self.current_turn != 'black'):
             return False
 
-        valid_moves = self.get_valid_moves(from_row, from_col)
-        if (to_row, to_col) not in valid_moves:
+        candidates = [move for move in self.get_all_valid_moves_for_color(is_white)
+                      if move[0] == from_row and move[1] == from_col and move[2] == to_row and move[3] == to_col]
+        if not candidates:
             return False
+        move = candidates[0]
+        if promotion is not None and len(move) == 5:
+            move = next(m for m in candidates if m[4].upper() == promotion.upper())
 
-        captured_piece = self.board[to_row][to_col]
-        self.board[to_row][to_col] = piece
-        self.board[from_row][from_col] = ' '
+        self.push(move)
+        self._move_map = None
+        self.update_result()
+        return True
 
-        if captured_piece.upper() == 'K':
+    def update_result(self):
+        """End the game if the side to move is checkmated or stalemated."""
+        is_white = self.current_turn == 'white'
+        if self.current_winner is None and not self.get_all_valid_moves_for_color(is_white):
+            if self.in_check(is_white):
+                self.current_winner = 'black' if is_white else 'white'
+            else:
+                self.current_winner = 'draw'
+
+    def push(self, move):
+        """Play ``move`` without validation and remember how to undo it.
+
+        ``move`` is a ``(from_row, from_col, to_row, to_col)`` tuple as returned
+        by ``get_all_valid_moves_for_color``, with the promoted piece as a fifth
+        element for promotions. Castling is a two-square king move and moves
+        the rook too; en passant removes the pawn that passed. Use ``pop`` to
+        take it back.
+        """
+        from_row, from_col, to_row, to_col = move[0], move[1], move[2], move[3]
+        from_sq, to_sq = from_row * 8 + from_col, to_row * 8 + to_col
+        piece = self.squares[from_sq]
+        captured = self.squares[to_sq]
+        en_passant = self.en_passant
+        self.move_stack.append((move, piece, captured, self.current_turn, self.current_winner,
+                                self.castling, en_passant))
+
+        self.set_piece(to_row, to_col, move[4] if len(move) == 5 else piece)
+        self.set_piece(from_row, from_col, ' ')
+
+        self.en_passant = None
+        if piece == 'P' or piece == 'p':
+            if to_sq == en_passant:
+                self.set_piece(from_row, to_col, ' ')
+            elif abs(to_sq - from_sq) == 16:
+                self.en_passant = (from_sq + to_sq) // 2
+        elif (piece == 'K' or piece == 'k') and abs(to_col - from_col) == 2:
+            if to_col == 6:
+                self.set_piece(to_row, 5, self.squares[to_row * 8 + 7])
+                self.set_piece(to_row, 7, ' ')
+            else:
+                self.set_piece(to_row, 3, self.squares[to_row * 8])
+                self.set_piece(to_row, 0, ' ')
+        self.castling &= ~(CASTLING_CLEARED_BY[from_sq] | CASTLING_CLEARED_BY[to_sq])
+
+        is_white = piece.isupper()
+        if captured == 'k' or captured == 'K':
             self.current_winner = 'white' if is_white else 'black'
-
         self.current_turn = 'black' if is_white else 'white'
-        return True
 
-    def get_all_valid_moves_for_color(self, is_white):
+    def pop(self):
+        """Undo the last ``push`` and return the move that was taken back."""
+        move, piece, captured, turn, winner, castling, en_passant = self.move_stack.pop()
+        from_row, from_col, to_row, to_col = move[0], move[1], move[2], move[3]
+        self.set_piece(from_row, from_col, piece)
+        self.set_piece(to_row, to_col, captured)
+        if piece == 'P' or piece == 'p':
+            if to_row * 8 + to_col == en_passant:
+                self.set_piece(from_row, to_col, 'p' if piece == 'P' else 'P')
+        elif (piece == 'K' or piece == 'k') and abs(to_col - from_col) == 2:
+            if to_col == 6:
+                self.set_piece(to_row, 7, self.squares[to_row * 8 + 5])
+                self.set_piece(to_row, 5, ' ')
+            else:
+                self.set_piece(to_row, 0, self.squares[to_row * 8 + 3])
+                self.set_piece(to_row, 3, ' ')
+        self.castling = castling
+        self.en_passant = en_passant
+        self.current_turn = turn
+        self.current_winner = winner
+        return move
+
+    def get_all_valid_moves_for_color(self, is_white, captures_only=False):
+        """Legal moves for one side, pawn moves first, then knights and the
+        king, then sliders.
+
+        Rather than playing every move and testing for check, the generator
+        works out the checking pieces and the pinned pieces once from the king
+        square: in double check only the king moves, in single check other
+        pieces must capture the checker or block, and a pinned piece stays on
+        the line to its pinner. King destinations are tested for attacks with
+        the king lifted off the board. Only en passant, which can uncover a
+        check along the rank, is tested by playing it out on the bitboards.
+        """
+        bitboards = self.bitboards
+        if is_white:
+            own, enemy = self.white_occupied, self.black_occupied
+            pawn, knight, bishop, rook, queen, king = WHITE_PIECES
+            enemy_diagonal = bitboards['b'] | bitboards['q']
+            enemy_straight = bitboards['r'] | bitboards['q']
+        else:
+            own, enemy = self.black_occupied, self.white_occupied
+            pawn, knight, bishop, rook, queen, king = BLACK_PIECES
+            enemy_diagonal = bitboards['B'] | bitboards['Q']
+            enemy_straight = bitboards['R'] | bitboards['Q']
+        occupied = own | enemy
+        allowed = enemy if captures_only else ~own & FULL_BOARD
+
         moves = []
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece != ' ' and self.is_white_piece(piece) == is_white:
-                    valid_moves = self.get_valid_moves(row, col)
-                    for to_row, to_col in valid_moves:
-                        moves.append((row, col, to_row, to_col))
+        append = moves.append
+
+        king_bb = bitboards[king]
+        king_moves = []
+        pinned = {}
+        king_sq = None
+        if king_bb:
+            king_sq = king_bb.bit_length() - 1
+            king_row, king_col = king_sq >> 3, king_sq & 7
+            is_attacked = self.is_attacked
+            without_king = occupied ^ king_bb
+            for to_sq in iter_squares(KING_ATTACKS[king_sq] & allowed):
+                if not is_attacked(to_sq, not is_white, without_king):
+                    king_moves.append((king_row, king_col, to_sq >> 3, to_sq & 7))
+
+            checkers = self.attackers_to(king_sq, occupied) & enemy
+            if checkers & (checkers - 1):
+                return king_moves
+            if checkers:
+                allowed &= checkers | BETWEEN[king_sq][checkers.bit_length() - 1]
+            elif not captures_only and self.castling:
+                king_moves.extend(self._castling_moves(is_white, occupied))
+
+            between = BETWEEN[king_sq]
+            snipers = (ROOK_RAYS[king_sq] & enemy_straight) | (BISHOP_RAYS[king_sq] & enemy_diagonal)
+            for sniper in iter_squares(snipers):
+                blockers = between[sniper] & occupied
+                if blockers & own and not blockers & (blockers - 1):
+                    pinned[blockers.bit_length() - 1] = between[sniper] | (1 << sniper)
+
+        # pawns are generated set-wise: shift the whole pawn bitboard once per
+        # move kind and recover the origin square from the fixed offset
+        pawns = bitboards[pawn]
+        empty = ~occupied & FULL_BOARD
+        if is_white:
+            single = (pawns >> 8) & empty
+            pawn_sets = (
+                (((pawns & NOT_FILE_A) >> 9) & enemy, 9),
+                (((pawns & NOT_FILE_H) >> 7) & enemy, 7),
+                (single, 8),
+                (((single & (0xFF << 40)) >> 8) & empty, 16),
+            )
+            last_rank = 0xFF
+        else:
+            single = (pawns << 8) & empty
+            pawn_sets = (
+                (((pawns & NOT_FILE_A) << 7) & enemy, -7),
+                (((pawns & NOT_FILE_H) << 9) & enemy, -9),
+                (single, -8),
+                (((single & (0xFF << 16)) << 8) & empty, -16),
+            )
+            last_rank = 0xFF << 56
+        if captures_only:
+            pawn_sets = pawn_sets[:2]
+        promotions = PROMOTIONS[is_white]
+        for targets, offset in pawn_sets:
+            for to_sq in iter_squares(targets & allowed):
+                from_sq = to_sq + offset
+                if from_sq in pinned and not pinned[from_sq] & (1 << to_sq):
+                    continue
+                move = (from_sq >> 3, from_sq & 7, to_sq >> 3, to_sq & 7)
+                if (1 << to_sq) & last_rank:
+                    for promoted in promotions:
+                        append(move + (promoted,))
+                else:
+                    append(move)
+
+        if self.en_passant is not None and king_sq is not None:
+            ep_sq = self.en_passant
+            ep_bit = 1 << ep_sq
+            captured_sq = ep_sq + 8 if is_white else ep_sq - 8
+            if is_white:
+                capturers = (((ep_bit & NOT_FILE_H) << 9) | ((ep_bit & NOT_FILE_A) << 7)) & pawns
+            else:
+                capturers = (((ep_bit & NOT_FILE_A) >> 9) | ((ep_bit & NOT_FILE_H) >> 7)) & pawns
+            for from_sq in iter_squares(capturers):
+                after = (occupied ^ (1 << from_sq) ^ (1 << captured_sq)) | ep_bit
+                if not self.attackers_to(king_sq, after) & enemy:
+                    append((from_sq >> 3, from_sq & 7, ep_sq >> 3, ep_sq & 7))
+
+        moves.extend(king_moves)
+        for from_sq in iter_squares(bitboards[knight]):
+            if from_sq in pinned:
+                continue
+            from_row, from_col = from_sq >> 3, from_sq & 7
+            for to_sq in iter_squares(KNIGHT_ATTACKS[from_sq] & allowed):
+                append((from_row, from_col, to_sq >> 3, to_sq & 7))
+
+        diagonal = bitboards[bishop] | bitboards[queen]
+        straight = bitboards[rook] | bitboards[queen]
+        for from_sq in iter_squares(diagonal | straight):
+            bit = 1 << from_sq
+            targets = 0
+            if diagonal & bit:
+                targets |= bishop_attacks(from_sq, occupied)
+            if straight & bit:
+                targets |= rook_attacks(from_sq, occupied)
+            targets &= allowed
+            if from_sq in pinned:
+                targets &= pinned[from_sq]
+            from_row, from_col = from_sq >> 3, from_sq & 7
+            for to_sq in iter_squares(targets):
+                append((from_row, from_col, to_sq >> 3, to_sq & 7))
+        return moves
+
+    def _castling_moves(self, is_white, occupied):
+        """Castling moves for a side that is not in check."""
+        squares = self.squares
+        is_attacked = self.is_attacked
+        moves = []
+        if is_white:
+            row, kingside, queenside, rook = 7, WHITE_KINGSIDE, WHITE_QUEENSIDE, 'R'
+        else:
+            row, kingside, queenside, rook = 0, BLACK_KINGSIDE, BLACK_QUEENSIDE, 'r'
+        base = row * 8
+        if (self.castling & kingside and squares[base + 7] == rook and
+                not occupied & (0b01100000 << base) and
+                not is_attacked(base + 5, not is_white, occupied) and not is_attacked(base + 6, not is_white, occupied)):
+            moves.append((row, 4, row, 6))
+        if (self.castling & queenside and squares[base] == rook and
+                not occupied & (0b00001110 << base) and
+                not is_attacked(base + 3, not is_white, occupied) and not is_attacked(base + 2, not is_white, occupied)):
+            moves.append((row, 4, row, 2))
         return moves
 
+    def in_check(self, is_white):
+        king_bb = self.bitboards['K' if is_white else 'k']
+        if not king_bb:
+            return False
+        return self.is_attacked(king_bb.bit_length() - 1, not is_white, self.white_occupied | self.black_occupied)
+
+    def attackers_to(self, sq, occupied):
+        """Bitboard of pieces of either colour attacking ``sq``.
+
+        Only pieces in ``occupied`` count and sliders see through squares
+        missing from it, so exchange evaluation can lift pieces off the board.
+        """
+        bitboards = self.bitboards
+        bit = 1 << sq
+        # a white pawn attacks sq from one row below (a higher square number)
+        white_pawns = (((bit & NOT_FILE_H) << 9) | ((bit & NOT_FILE_A) << 7)) & bitboards['P']
+        black_pawns = (((bit & NOT_FILE_A) >> 9) | ((bit & NOT_FILE_H) >> 7)) & bitboards['p']
+        diagonal = bitboards['B'] | bitboards['b'] | bitboards['Q'] | bitboards['q']
+        straight = bitboards['R'] | bitboards['r'] | bitboards['Q'] | bitboards['q']
+        attackers = (white_pawns | black_pawns |
+                     KNIGHT_ATTACKS[sq] & (bitboards['N'] | bitboards['n']) |
+                     KING_ATTACKS[sq] & (bitboards['K'] | bitboards['k']) |
+                     bishop_attacks(sq, occupied) & diagonal |
+                     rook_attacks(sq, occupied) & straight)
+        return attackers & occupied
+
+    def is_attacked(self, sq, by_white, occupied):
+        """Whether ``by_white``'s pieces attack ``sq``; cheaper than
+        ``attackers_to`` since it looks at one side and stops at the first hit."""
+        bitboards = self.bitboards
+        bit = 1 << sq
+        if by_white:
+            pawn, knight, bishop, rook, queen, king = WHITE_PIECES
+            pawn_attackers = ((bit & NOT_FILE_H) << 9) | ((bit & NOT_FILE_A) << 7)
+        else:
+            pawn, knight, bishop, rook, queen, king = BLACK_PIECES
+            pawn_attackers = ((bit & NOT_FILE_A) >> 9) | ((bit & NOT_FILE_H) >> 7)
+        queens = bitboards[queen]
+        return bool(KNIGHT_ATTACKS[sq] & bitboards[knight] or
+                    pawn_attackers & bitboards[pawn] or
+                    bishop_attacks(sq, occupied) & (bitboards[bishop] | queens) or
+                    rook_attacks(sq, occupied) & (bitboards[rook] | queens) or
+                    KING_ATTACKS[sq] & bitboards[king])
+
+    def static_exchange(self, move):
+        """Material won by ``move`` if both sides keep recapturing on its
+        target square with their least valuable piece and may stop at any
+        point (static exchange evaluation)."""
+        from_row, from_col, to_row, to_col = move[0], move[1], move[2], move[3]
+        from_sq, to_sq = from_row * 8 + from_col, to_row * 8 + to_col
+        squares = self.squares
+        bitboards = self.bitboards
+        piece = squares[from_sq]
+        occupied = (self.white_occupied | self.black_occupied) & ~(1 << from_sq)
+        gains = [abs(PIECE_VALUES[squares[to_sq]])]
+        on_square = abs(PIECE_VALUES[piece])
+        side_pieces = BLACK_PIECES if piece.isupper() else WHITE_PIECES
+
+        while True:
+            attackers = self.attackers_to(to_sq, occupied)
+            for attacker in side_pieces:
+                attacker_bb = attackers & bitboards[attacker]
+                if attacker_bb:
+                    break
+            else:
+                break
+            gains.append(on_square - gains[-1])
+            if max(-gains[-2], gains[-1]) < 0:
+                break
+            occupied &= ~(attacker_bb & -attacker_bb)
+            on_square = abs(PIECE_VALUES[attacker])
+            side_pieces = BLACK_PIECES if side_pieces is WHITE_PIECES else WHITE_PIECES
+
+        while len(gains) > 1:
+            last = gains.pop()
+            gains[-1] = -max(-gains[-1], last)
+        return gains[0]
+
     def game_over(self):
         return self.current_winner is not None
 
 
-class ChessAI:
-    def __init__(self, difficulty='medium'):
+_opening_book = None
+
+
+def load_opening_book(path=BOOK_PATH):
+    """Map the opening book once; None when there is no book file."""
+    global _opening_book
+    if _opening_book is None:
+        _opening_book = OpeningBook(path, Chess().zobrist_key) if os.path.exists(path) else False
+    return _opening_book or None
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the iterative-deepening deadline passes."""
+
+
+# Root-parallel search runs in one pool of long-lived worker processes,
+# created on first use and shared by every ChessAI; an AI uses at most
+# search_pool_size() of them. Each worker keeps its own ChessAI (and
+# transposition table) per search configuration between requests.
+#
+# Stopping a search (ChessAI.stop_requested) has to reach the workers too, so
+# the pool shares an array of stop flags with them. Every parallel search
+# holds one slot while it runs and raises its flag when asked to stop.
+SEARCH_STOP_SLOTS = 256
+_search_pool = None
+_search_pool_size = os.cpu_count() or 1
+_search_pool_lock = threading.Lock()
+_search_stop_flags = None
+_free_stop_slots = []
+_worker_ais = {}
+
+
+def set_search_pool_size(workers):
+    """Set the size of the shared pool; call before the pool is first used."""
+    global _search_pool_size
+    with _search_pool_lock:
+        if _search_pool is not None:
+            raise RuntimeError('the search pool has already been started')
+        _search_pool_size = max(1, workers)
+
+
+def search_pool_size():
+    return _search_pool_size
+
+
+def start_search_pool(mp_context=None):
+    """Start the shared pool now if it is not running yet.
+
+    Servers call this before starting any threads, so the workers can be
+    forked safely. A pool started lazily by ``get_search_pool`` may be
+    created from a process that already runs threads, and forking such a
+    process can deadlock the child, so that pool uses the forkserver (or
+    spawn) start method instead.
+    """
+    global _search_pool, _search_stop_flags, _free_stop_slots
+    with _search_pool_lock:
+        if _search_pool is None:
+            _search_stop_flags = (mp_context or multiprocessing).RawArray('b', SEARCH_STOP_SLOTS)
+            _free_stop_slots = list(range(SEARCH_STOP_SLOTS))
+            _search_pool = ProcessPoolExecutor(max_workers=_search_pool_size, mp_context=mp_context,
+                                               initializer=_init_search_worker, initargs=(_search_stop_flags,))
+            # start every worker now rather than on the first real search
+            for future in [_search_pool.submit(os.getpid) for _ in range(_search_pool_size)]:
+                future.result()
+        return _search_pool
+
+
+def get_search_pool():
+    if _search_pool is not None:
+        return _search_pool
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return start_search_pool(multiprocessing.get_context(method))
+
+
+def shutdown_search_pools():
+    global _search_pool
+    with _search_pool_lock:
+        if _search_pool is not None:
+            _search_pool.shutdown(cancel_futures=True)
+            _search_pool = None
+
+
+def _acquire_stop_slot():
+    """Take a free stop flag for one parallel search; None if all are in use."""
+    with _search_pool_lock:
+        return _free_stop_slots.pop() if _free_stop_slots else None
+
+
+def _release_stop_slot(slot):
+    with _search_pool_lock:
+        _search_stop_flags[slot] = 0
+        _free_stop_slots.append(slot)
+
+
+def _init_search_worker(stop_flags):
+    global _search_stop_flags
+    _search_stop_flags = stop_flags
+
+
+def _search_root_chunk(state, moves, depth, is_white, config, move_ordering, time_limit, stop_slot):
+    # configs arrive as fresh copies, so worker AIs are found by their settings
+    key = (config.difficulty, config.max_depth, config.think_ms, tuple(sorted(config.piece_values.items())),
+           config.use_book, config.quiescence, move_ordering)
+    ai = _worker_ais.get(key)
+    if ai is None:
+        ai = _worker_ais[key] = ChessAI(config=config)
+        ai.move_ordering = move_ordering
+    game = Chess.from_state(state)
+    ai.new_search()
+    ai.nodes = 0
+    ai.cutoffs = 0
+    # without a time limit the clock never runs out, but the stop flag is
+    # still checked at every clock check
+    ai.deadline = time.perf_counter() + time_limit if time_limit is not None else math.inf
+    ai.stop_slot = stop_slot
+    try:
+        best_value, best_moves = ai.search_root(game, moves, depth, is_white)
+    except SearchTimeout:
+        return None
+    finally:
+        ai.deadline = None
+        ai.stop_slot = None
+    return best_value, best_moves, ai.nodes, ai.cutoffs, ai.seldepth
+
+
+class ChessAIConfig:
+    """Search settings shared by every ChessAI of one difficulty.
+
+    Games only hold a reference to one of these, so per-game AI state is
+    limited to the search tables.
+    """
+
+    shared = True
+
+    __slots__ = ('difficulty', 'max_depth', 'think_ms', 'piece_values', 'use_book', 'quiescence')
+
+    def __init__(self, difficulty, max_depth, think_ms, piece_values=PIECE_VALUES, use_book=True,
+                 quiescence=True):
         self.difficulty = difficulty
-        self.max_depth = {'easy': 1, 'medium': 2, 'hard': 3}[difficulty]
+        self.max_depth = max_depth
+        self.think_ms = think_ms
+        self.piece_values = piece_values
+        self.use_book = use_book
+        self.quiescence = quiescence
 
-        self.piece_values = {
-            'P': 10, 'N': 30, 'B': 30, 'R': 50, 'Q': 90, 'K': 900,
-            'p': -10, 'n': -30, 'b': -30, 'r': -50, 'q': -90, 'k': -900
-        }
 
-    def get_move(self, game, is_white):
+class ChessAI:
+    # Depth caps and default think time per difficulty. Iterative deepening
+    # keeps going until either the cap or the time budget is reached.
+    MAX_DEPTH = {'easy': 1, 'medium': 2, 'hard': 4}
+    THINK_MS = {'easy': 0, 'medium': 300, 'hard': 1000}
+
+    # How many nodes to search between clock checks.
+    TIME_CHECK_INTERVAL = 1024
+
+    # Seconds between checks of stop_requested while worker processes search.
+    STOP_POLL_INTERVAL = 0.01
+
+    # Score for checkmating the opponent; mates found nearer the root score
+    # higher so the search prefers the quickest mate.
+    MATE_SCORE = 100000
+
+    # Scores beyond this are mates. The transposition table stores them as
+    # distance from the stored position rather than from the search root, so
+    # an entry stays right when it is reached at another ply or in a later
+    # search.
+    MATE_BOUND = MATE_SCORE - 1000
+
+    # Quiescence skips a capture when the captured piece plus this margin
+    # (two pawns) still leaves the score outside the window.
+    DELTA_MARGIN = 20
+
+    __slots__ = ('config', 'workers', 'tt', 'move_cache', 'deadline', 'stop_requested', 'stop_slot', 'on_progress',
+                 'nodes', 'cutoffs', 'seldepth', 'completed_depth', 'move_ordering', 'killers', 'history',
+                 'root_ply')
+
+    def __init__(self, difficulty='medium', tt_size_mb=1, workers=1, config=None, move_cache=None):
+        self.config = config or CHESS_AI_CONFIGS[difficulty]
+        self.workers = max(1, min(workers, search_pool_size()))
+        self.tt = TranspositionTable(tt_size_mb)
+        # optional MoveCache shared between games; only searches that reach
+        # max_depth are stored, since shallower ones depend on the clock
+        self.move_cache = move_cache
+        self.deadline = None
+        # set from another thread to end an iterative-deepening search early;
+        # it returns the best move of the last completed depth
+        self.stop_requested = False
+        # in a pool worker, the shared stop flag of the parallel search this
+        # AI is running a part of
+        self.stop_slot = None
+        # called with a summary after every completed iterative-deepening depth
+        self.on_progress = None
+        # nodes and cutoffs count up for the AI's lifetime; seldepth is the
+        # deepest ply reached by the current search
+        self.nodes = 0
+        self.cutoffs = 0
+        self.seldepth = 0
+        self.completed_depth = 0
+
+        # Move ordering state: two killer moves per ply from the root and a
+        # history score per (from, to) move, both learnt from beta cutoffs.
+        self.move_ordering = True
+        self.killers = []
+        self.history = {}
+        self.root_ply = 0
+
+    @property
+    def difficulty(self):
+        return self.config.difficulty
+
+    @property
+    def max_depth(self):
+        return self.config.max_depth
+
+    @property
+    def think_ms(self):
+        return self.config.think_ms
+
+    @property
+    def piece_values(self):
+        return self.config.piece_values
+
+    def release_memory(self):
+        """Drop search tables; called for games that have gone idle."""
+        self.tt.clear()
+        self.killers = []
+        self.history = {}
+
+    def get_move(self, game, is_white, think_ms=None):
         if self.difficulty == 'easy':
             return self.easy_move(game, is_white)
-        else:
-            return self.minimax_move(game, is_white)
+        move = self.book_move(game, is_white) if self.config.use_book else None
+        if move is not None:
+            self.seldepth = 0
+            self.completed_depth = 0
+            return move
+        if self.move_cache is not None:
+            cached = self.move_cache.get(self.cache_key(game))
+            if cached is not None:
+                self.seldepth = 0
+                self.completed_depth = self.max_depth
+                return random.choice(cached[1])
+        return self.iterative_deepening_move(game, is_white, think_ms)
+
+    def cache_key(self, game):
+        return 'chess', game.zobrist_key, game.current_turn, self.difficulty
+
+    def book_move(self, game, is_white):
+        """A weighted random opening book move for this position, or None."""
+        book = load_opening_book()
+        if book is None or game.current_turn != ('white' if is_white else 'black'):
+            return None
+        move = book.choose(game.zobrist_key)
+        if move is None:
+            return None
+        # guard against a hash collision handing back a move for another position
+        from_row, from_col, to_row, to_col = move
+        piece = game.squares[from_row * 8 + from_col]
+        if piece == ' ' or piece.isupper() != is_white or (to_row, to_col) not in game.get_valid_moves(from_row, from_col):
+            return None
+        return move
 
     def easy_move(self, game, is_white):
         moves = game.get_all_valid_moves_for_color(is_white)
         return random.choice(moves) if moves else None
 
-    def minimax_move(self, game, is_white):
-        best_move = None
-        best_value = -math.inf if is_white else math.inf
+    def minimax_move(self, game, is_white, depth=None):
+        """Fixed-depth search; picks at random among equally scored moves."""
+        depth = depth or self.max_depth
+        self.new_search()
+        moves = game.get_all_valid_moves_for_color(is_white)
+        if not moves:
+            return None
+        random.shuffle(moves)
+        if self.move_ordering:
+            moves = self.order_moves(game, moves, None, 0)
 
+        if self.workers > 1:
+            best_value, best_moves = self.search_root_parallel(game, moves, depth, is_white)
+        else:
+            best_value, best_moves = self.search_root(game, moves, depth, is_white)
+        self.completed_depth = depth
+        return self.choose_root_move(game, depth, best_value, best_moves)
+
+    def iterative_deepening_move(self, game, is_white, think_ms=None):
+        """Search depth 1, 2, ... until ``max_depth`` or ``think_ms`` runs out.
+
+        Each iteration searches the previous iteration's best move first and
+        the transposition table carries the rest of the principal variation,
+        so deeper iterations get good move ordering for free. If the deadline
+        passes mid-iteration, the best move of the last completed depth is
+        returned. Depth 1 always completes so there is always a move, and a
+        new iteration is not started once half the budget is spent since it
+        would almost certainly be abandoned.
+        """
+        if think_ms is None:
+            think_ms = self.think_ms
+        self.new_search()
+        self.completed_depth = 0
         moves = game.get_all_valid_moves_for_color(is_white)
+        if not moves:
+            return None
         random.shuffle(moves)
+        if self.move_ordering:
+            moves = self.order_moves(game, moves, None, 0)
 
-        for from_row, from_col, to_row, to_col in moves:
-            piece = game.board[from_row][from_col]
-            captured = game.board[to_row][to_col]
+        start = time.perf_counter()
+        deadline = start + think_ms / 1000
+        start_nodes = self.nodes
+        best_move = None
+        for depth in range(1, self.max_depth + 1):
+            if depth > 1 and self.stop_requested:
+                break
+            self.deadline = deadline if depth > 1 else None
+            try:
+                if depth > 1 and self.workers > 1:
+                    best_value, best_moves = self.search_root_parallel(game, moves, depth, is_white)
+                else:
+                    best_value, best_moves = self.search_root(game, moves, depth, is_white)
+            except SearchTimeout:
+                break
+            finally:
+                self.deadline = None
+
+            best_move = self.choose_root_move(game, depth, best_value, best_moves)
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+            self.completed_depth = depth
+            if self.on_progress is not None:
+                self.on_progress({
+                    'depth': depth,
+                    'best_move': best_move,
+                    'score': best_value,
+                    'nodes': self.nodes - start_nodes,
+                    'seldepth': self.seldepth,
+                    'time_ms': round((time.perf_counter() - start) * 1000, 3)
+                })
+            if (time.perf_counter() - start) * 2 >= think_ms / 1000:
+                break
 
-            game.board[to_row][to_col] = piece
-            game.board[from_row][from_col] = ' '
-            game.current_turn = 'black' if is_white else 'white'
+        return best_move
 
-            value = self.minimax(game, self.max_depth - 1, -math.inf, math.inf, not is_white)
+    def search_root(self, game, moves, depth, is_white):
+        """Search every root move and return ``(best_value, best_moves)``.
 
-            game.board[from_row][from_col] = piece
-            game.board[to_row][to_col] = captured
-            game.current_turn = 'white' if is_white else 'black'
+        Each child is searched with a window just below (white) or above
+        (black) the best value so far, so moves that tie with the best are
+        scored exactly and kept as alternatives while worse moves are cut off.
+        Scores are integers, so a margin of one is enough.
+        """
+        best_value = -math.inf if is_white else math.inf
+        best_moves = []
+        base = len(game.move_stack)
+        self.root_ply = base
+
+        try:
+            for move in moves:
+                game.push(move)
+                if is_white:
+                    value = self.minimax(game, depth - 1, best_value - 1, math.inf, False)
+                else:
+                    value = self.minimax(game, depth - 1, -math.inf, best_value + 1, True)
+                game.pop()
+
+                if value == best_value:
+                    best_moves.append(move)
+                elif (value > best_value) == is_white:
+                    best_value = value
+                    best_moves = [move]
+        except SearchTimeout:
+            while len(game.move_stack) > base:
+                game.pop()
+            raise
+
+        return best_value, best_moves
+
+    def search_root_parallel(self, game, moves, depth, is_white):
+        """``search_root`` with the root moves split across worker processes.
+
+        Moves are dealt round-robin so each worker gets a share of the
+        well-ordered front of the list. Every chunk reports its best value and
+        all moves tied with it, so merging gives the same value and the same
+        set of best moves as the serial search at this depth.
+
+        While waiting, ``stop_requested`` is polled and passed on to the
+        workers through the search's shared stop flag.
+        """
+        pool = get_search_pool()
+        time_limit = None
+        if self.deadline is not None:
+            time_limit = max(0.0, self.deadline - time.perf_counter())
+        state = game.to_state()
+        chunks = [moves[i::self.workers] for i in range(self.workers)]
+        slot = _acquire_stop_slot()
+        try:
+            futures = [
+                pool.submit(_search_root_chunk, state, chunk, depth, is_white, self.config, self.move_ordering,
+                            time_limit, slot)
+                for chunk in chunks if chunk
+            ]
+            pending = set(futures)
+            while pending:
+                _, pending = wait(pending, timeout=self.STOP_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                if self.stop_requested and slot is not None:
+                    _search_stop_flags[slot] = 1
+            results = [future.result() for future in futures]
+        finally:
+            if slot is not None:
+                _release_stop_slot(slot)
 
-            if is_white and value > best_value:
-                best_value = value
-                best_move = (from_row, from_col, to_row, to_col)
-            elif not is_white and value < best_value:
+        best_value = -math.inf if is_white else math.inf
+        best_moves = []
+        timed_out = False
+        for result in results:
+            if result is None:
+                timed_out = True
+                continue
+            value, chunk_moves, nodes, cutoffs, seldepth = result
+            self.nodes += nodes
+            self.cutoffs += cutoffs
+            self.seldepth = max(self.seldepth, seldepth)
+            if value == best_value:
+                best_moves.extend(chunk_moves)
+            elif (value > best_value) == is_white:
                 best_value = value
-                best_move = (from_row, from_col, to_row, to_col)
-
+                best_moves = list(chunk_moves)
+        if timed_out:
+            raise SearchTimeout()
+
+        # keep the serial move order so ties are broken the same way
+        order = {move: i for i, move in enumerate(moves)}
+        best_moves.sort(key=order.__getitem__)
+        return best_value, best_moves
+
+    def choose_root_move(self, game, depth, best_value, best_moves):
+        best_move = random.choice(best_moves)
+        self.tt.store(game.zobrist_key, depth, best_value, EXACT, best_move)
+        if self.move_cache is not None and depth == self.max_depth:
+            self.move_cache.put(self.cache_key(game), best_value, best_moves)
         return best_move
 
+    def new_search(self):
+        self.tt.new_search()
+        self.seldepth = 0
+        self.killers = []
+        # age history scores so that the previous move's statistics guide but
+        # do not dominate this one
+        self.history = {move: score // 2 for move, score in self.history.items() if score > 1}
+
+    def order_moves(self, game, moves, tt_move, ply):
+        """Sort ``moves`` best-first for alpha-beta.
+
+        The transposition-table move comes first, then captures in
+        most-valuable-victim / least-valuable-attacker order, then this ply's
+        killer moves, then quiet moves by history score. ``sort`` is stable so
+        equally scored moves keep their incoming (possibly shuffled) order.
+        """
+        squares = game.squares
+        values = self.piece_values
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history
+
+        def score(move):
+            if move == tt_move:
+                return 1000000
+            victim = squares[move[2] * 8 + move[3]]
+            if victim != ' ':
+                attacker = squares[move[0] * 8 + move[1]]
+                return 100000 + 100 * abs(values[victim]) - abs(values[attacker])
+            if len(move) == 5:
+                return 100000 + 100 * abs(values[move[4]])
+            if move in killers:
+                return 90000 - killers.index(move)
+            return history.get(move, 0)
+
+        return sorted(moves, key=score, reverse=True)
+
+    def record_cutoff(self, game, move, depth, ply):
+        """Remember a quiet move that caused a beta cutoff."""
+        self.cutoffs += 1
+        if game.squares[move[2] * 8 + move[3]] != ' ' or len(move) == 5:
+            return
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+    def out_of_time(self):
+        """True once the deadline has passed or the search was asked to stop."""
+        if self.stop_requested or time.perf_counter() >= self.deadline:
+            return True
+        return self.stop_slot is not None and _search_stop_flags[self.stop_slot] != 0
+
     def minimax(self, game, depth, alpha, beta, is_white):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % self.TIME_CHECK_INTERVAL == 0:
+            if self.out_of_time():
+                raise SearchTimeout()
+
+        if depth == 0 and self.config.quiescence and not game.game_over():
+            return self.quiescence(game, alpha, beta, is_white)
         if depth == 0 or game.game_over():
+            ply = len(game.move_stack) - self.root_ply
+            if ply > self.seldepth:
+                self.seldepth = ply
             return self.evaluate_board(game)
 
-        moves = game.get_all_valid_moves_for_color(is_white)
+        key = game.zobrist_key
+        ply = len(game.move_stack) - self.root_ply
+        tt_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            _, entry_depth, entry_score, entry_flag, tt_move, _ = entry
+            if entry_depth >= depth:
+                entry_score = self.score_from_tt(entry_score, ply)
+                if entry_flag == EXACT:
+                    return entry_score
+                elif entry_flag == LOWER:
+                    alpha = max(alpha, entry_score)
+                else:
+                    beta = min(beta, entry_score)
+                if beta <= alpha:
+                    return entry_score
 
+        moves = game.get_all_valid_moves_for_color(is_white)
         if not moves:
-            return self.evaluate_board(game)
+            return self.no_moves_score(game, is_white, ply)
 
-        if is_white:
-            max_eval = -math.inf
-            for from_row, from_col, to_row, to_col in moves:
-                piece = game.board[from_row][from_col]
-                captured = game.board[to_row][to_col]
+        if self.move_ordering:
+            moves = self.order_moves(game, moves, tt_move, ply)
+        elif tt_move is not None and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
 
-                game.board[to_row][to_col] = piece
-                game.board[from_row][from_col] = ' '
+        window_alpha, window_beta = alpha, beta
+        best_move = None
 
+        if is_white:
+            best_eval = -math.inf
+            for move in moves:
+                game.push(move)
                 eval_score = self.minimax(game, depth - 1, alpha, beta, False)
+                game.pop()
 
-                game.board[from_row][from_col] = piece
-                game.board[to_row][to_col] = captured
-
-                max_eval = max(max_eval, eval_score)
+                if eval_score > best_eval:
+                    best_eval = eval_score
+                    best_move = move
                 alpha = max(alpha, eval_score)
                 if beta <= alpha:
+                    self.record_cutoff(game, move, depth, ply)
                     break
-
-            return max_eval
         else:
-            min_eval = math.inf
-            for from_row, from_col, to_row, to_col in moves:
-                piece = game.board[from_row][from_col]
-                captured = game.board[to_row][to_col]
-
-                game.board[to_row][to_col] = piece
-                game.board[from_row][from_col] = ' '
-
+            best_eval = math.inf
+            for move in moves:
+                game.push(move)
                 eval_score = self.minimax(game, depth - 1, alpha, beta, True)
+                game.pop()
 
-                game.board[from_row][from_col] = piece
-                game.board[to_row][to_col] = captured
-
-                min_eval = min(min_eval, eval_score)
+                if eval_score < best_eval:
+                    best_eval = eval_score
+                    best_move = move
                 beta = min(beta, eval_score)
                 if beta <= alpha:
+                    self.record_cutoff(game, move, depth, ply)
                     break
 
-            return min_eval
+        if best_eval <= window_alpha:
+            flag = UPPER
+        elif best_eval >= window_beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, self.score_to_tt(best_eval, ply), flag, best_move)
+
+        return best_eval
+
+    def quiescence(self, game, alpha, beta, is_white):
+        """Search captures only until the position is quiet.
+
+        The side to move may stand pat on the static score, captures that
+        lose material by static exchange are skipped, and so are captures
+        that could not bring the score back to the window even if the
+        captured piece came for free plus DELTA_MARGIN. A side in check
+        cannot stand pat and searches every evasion instead.
+        """
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % self.TIME_CHECK_INTERVAL == 0:
+            if self.out_of_time():
+                raise SearchTimeout()
+
+        ply = len(game.move_stack) - self.root_ply
+        if ply > self.seldepth:
+            self.seldepth = ply
+        stand_pat = self.evaluate_board(game)
+        if game.game_over():
+            return stand_pat
+
+        squares = game.squares
+        values = self.piece_values
+        if game.in_check(is_white):
+            moves = game.get_all_valid_moves_for_color(is_white)
+            if not moves:
+                return self.no_moves_score(game, is_white, ply)
+            best_eval = -math.inf if is_white else math.inf
+            scored = [(0, move) for move in self.order_moves(game, moves, None, ply)]
+        else:
+            if is_white:
+                if stand_pat >= beta:
+                    return stand_pat
+                alpha = max(alpha, stand_pat)
+            else:
+                if stand_pat <= alpha:
+                    return stand_pat
+                beta = min(beta, stand_pat)
+
+            scored = []
+            for move in game.get_all_valid_moves_for_color(is_white, captures_only=True):
+                from_row, from_col, to_row, to_col = move[0], move[1], move[2], move[3]
+                gain = abs(values[squares[to_row * 8 + to_col]])
+                # delta pruning: even winning the piece outright cannot reach the window
+                if is_white and stand_pat + gain + self.DELTA_MARGIN <= alpha:
+                    continue
+                if not is_white and stand_pat - gain - self.DELTA_MARGIN >= beta:
+                    continue
+                if game.static_exchange(move) < 0:
+                    continue
+                scored.append((gain * 100 - abs(values[squares[from_row * 8 + from_col]]), move))
+            scored.sort(key=lambda item: item[0], reverse=True)
+            best_eval = stand_pat
+
+        for _, move in scored:
+            game.push(move)
+            eval_score = self.quiescence(game, alpha, beta, not is_white)
+            game.pop()
+            if is_white:
+                if eval_score > best_eval:
+                    best_eval = eval_score
+                alpha = max(alpha, eval_score)
+            else:
+                if eval_score < best_eval:
+                    best_eval = eval_score
+                beta = min(beta, eval_score)
+            if beta <= alpha:
+                self.cutoffs += 1
+                break
+        return best_eval
+
+    def score_to_tt(self, score, ply):
+        """Convert a mate score from distance-from-root to distance-from-node."""
+        if score > self.MATE_BOUND:
+            return score + ply
+        if score < -self.MATE_BOUND:
+            return score - ply
+        return score
 
-    def evaluate_board(self, game):
-        score = 0
-        for row in range(8):
-            for col in range(8):
-                piece = game.board[row][col]
-                if piece in self.piece_values:
-                    score += self.piece_values[piece]
+    def score_from_tt(self, score, ply):
+        """Inverse of ``score_to_tt``."""
+        if score > self.MATE_BOUND:
+            return score - ply
+        if score < -self.MATE_BOUND:
+            return score + ply
         return score
+
+    def no_moves_score(self, game, is_white, ply):
+        """Score of a position where ``is_white``'s side has no legal move."""
+        if not game.in_check(is_white):
+            return 0
+        return -(self.MATE_SCORE - ply) if is_white else self.MATE_SCORE - ply
+
+    def evaluate_board(self, game):
+        return game.material
+
+
+CHESS_AI_CONFIGS = {
+    difficulty: ChessAIConfig(difficulty, ChessAI.MAX_DEPTH[difficulty], ChessAI.THINK_MS[difficulty])
+    for difficulty in ChessAI.MAX_DEPTH
+}
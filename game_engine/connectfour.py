@@ -1,69 +1,272 @@
 import math
 import random
+import time
+
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+ROWS = 6
+COLS = 7
+# Each column takes ROWS + 1 bits: bit (col * 7 + h) is the cell h rows above
+# the bottom of that column, and the extra top bit stays empty so that shifts
+# never carry a line over from one column into the next.
+COLUMN_BITS = ROWS + 1
+BOTTOM_ROW = sum(1 << (col * COLUMN_BITS) for col in range(COLS))
+# Shift distances for the four line directions: vertical, horizontal and the
+# two diagonals.
+DIRECTIONS = (1, COLUMN_BITS, COLUMN_BITS - 1, COLUMN_BITS + 1)
+COLUMN_MASK = (1 << COLUMN_BITS) - 1
+BOARD_BITS = COLS * COLUMN_BITS
+
+
+def _build_windows():
+    """Every four-cell line on the board, as tuples of bit indices (69 in all)."""
+    windows = []
+    for col in range(COLS):
+        for h in range(ROWS):
+            for dc, dh in ((1, 0), (0, 1), (1, 1), (1, -1)):
+                cells = [(col + dc * i, h + dh * i) for i in range(4)]
+                if all(0 <= c < COLS and 0 <= r < ROWS for c, r in cells):
+                    windows.append(tuple(c * COLUMN_BITS + r for c, r in cells))
+    return windows
+
+
+WINDOWS = _build_windows()
+# For each bit index, the windows that contain that cell.
+CELL_WINDOWS = [
+    tuple(w for w, cells in enumerate(WINDOWS) if index in cells)
+    for index in range(BOARD_BITS)
+]
+
+# Value of a window from red's point of view, indexed by its state
+# red_count * 5 + yellow_count. Only windows held by one side are threats:
+# an open two is worth 2 and an open three 5. Four in a row ends the game,
+# so it is scored by the winner check instead.
+THREAT_VALUES = (0, 0, 2, 5, 0)
+WINDOW_VALUES = [
+    THREAT_VALUES[red] if yellow == 0 else -THREAT_VALUES[yellow] if red == 0 else 0
+    for red in range(5) for yellow in range(5)
+]
+# Change in window state and in value when a red or yellow piece is added to
+# a window in a given state.
+WINDOW_STEP = {'R': 5, 'Y': 1}
+WINDOW_DELTAS = {
+    letter: [WINDOW_VALUES[state + step] - WINDOW_VALUES[state] if state + step < 25 else 0
+             for state in range(25)]
+    for letter, step in WINDOW_STEP.items()
+}
+
+
+def mirror(bb):
+    """Reflect a bitboard left to right (column c becomes column COLS-1-c)."""
+    mirrored = 0
+    for col in range(COLS):
+        mirrored |= ((bb >> (col * COLUMN_BITS)) & COLUMN_MASK) << ((COLS - 1 - col) * COLUMN_BITS)
+    return mirrored
+
+
+def has_four(bb):
+    for shift in DIRECTIONS:
+        pairs = bb & (bb >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
 
 class ConnectFour:
+    """Connect Four on two bitmasks (one per letter) plus column heights."""
+
+    __slots__ = ('bitboards', 'heights', 'window_states', 'threat_score', 'current_winner')
+
+    rows = ROWS
+    cols = COLS
+
     def __init__(self):
-        self.rows = 6
-        self.cols = 7
-        self.board = [[' ' for _ in range(self.cols)] for _ in range(self.rows)]
-        self.current_winner = None
+        self.reset()
 
     def reset(self):
-        self.board = [[' ' for _ in range(self.cols)] for _ in range(self.rows)]
+        self.bitboards = {'R': 0, 'Y': 0}
+        # both fit in a byte per entry: heights are 0..6, window states 0..24
+        self.heights = bytearray(COLS)
+        self.window_states = bytearray(len(WINDOWS))
+        self.threat_score = 0
         self.current_winner = None
 
+    def to_state(self):
+        """Compact, JSON-safe snapshot: one bitmask per letter and the winner."""
+        return {
+            'R': self.bitboards['R'],
+            'Y': self.bitboards['Y'],
+            'current_winner': self.current_winner
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        game = cls()
+        for col in range(COLS):
+            for h in range(ROWS):
+                bit = 1 << (col * COLUMN_BITS + h)
+                if state['R'] & bit:
+                    game.drop(col, 'R')
+                elif state['Y'] & bit:
+                    game.drop(col, 'Y')
+                else:
+                    break
+        game.current_winner = state['current_winner']
+        return game
+
+    @property
+    def board(self):
+        return self.get_board()
+
     def get_board(self):
-        return self.board
+        board = [[' ' for _ in range(self.cols)] for _ in range(self.rows)]
+        for letter, bb in self.bitboards.items():
+            for col in range(self.cols):
+                for h in range(self.heights[col]):
+                    if bb >> (col * COLUMN_BITS + h) & 1:
+                        board[self.rows - 1 - h][col] = letter
+        return board
 
     def is_valid_move(self, col):
-        return self.board[0][col] == ' '
+        return 0 <= col < self.cols and self.heights[col] < self.rows
 
     def get_next_open_row(self, col):
-        for r in range(self.rows-1, -1, -1):
-            if self.board[r][col] == ' ':
-                return r
+        if self.heights[col] < self.rows:
+            return self.rows - 1 - self.heights[col]
         return None
 
     def make_move(self, col, letter):
-        if not self.is_valid_move(col):
+        if letter not in self.bitboards or not self.is_valid_move(col):
             return False
 
-        row = self.get_next_open_row(col)
-        if row is not None:
-            self.board[row][col] = letter
-            if self.check_winner(row, col, letter):
-                self.current_winner = letter
-            return True
-        return False
+        self.drop(col, letter)
+        return True
+
+    def drop(self, col, letter):
+        """Put ``letter`` on top of ``col`` without validation; see ``lift``."""
+        index = col * COLUMN_BITS + self.heights[col]
+        bb = self.bitboards[letter] | (1 << index)
+        self.heights[col] += 1
+        self.bitboards[letter] = bb
+
+        states = self.window_states
+        deltas = WINDOW_DELTAS[letter]
+        step = WINDOW_STEP[letter]
+        score = self.threat_score
+        for w in CELL_WINDOWS[index]:
+            state = states[w]
+            score += deltas[state]
+            states[w] = state + step
+        self.threat_score = score
+
+        if has_four(bb):
+            self.current_winner = letter
+
+    def lift(self, col):
+        """Take back the top piece of ``col`` played with ``drop``."""
+        self.heights[col] -= 1
+        index = col * COLUMN_BITS + self.heights[col]
+        bit = 1 << index
+        letter = 'R' if self.bitboards['R'] & bit else 'Y'
+        self.bitboards[letter] ^= bit
+
+        states = self.window_states
+        deltas = WINDOW_DELTAS[letter]
+        step = WINDOW_STEP[letter]
+        score = self.threat_score
+        for w in CELL_WINDOWS[index]:
+            state = states[w] - step
+            states[w] = state
+            score -= deltas[state]
+        self.threat_score = score
+        self.current_winner = None
 
     def check_winner(self, row, col, letter):
-        def check_direction(dr, dc):
-            count = 1
-            for direction in [1, -1]:
-                r, c = row + dr * direction, col + dc * direction
-                while 0 <= r < self.rows and 0 <= c < self.cols and self.board[r][c] == letter:
-                    count += 1
-                    r += dr * direction
-                    c += dc * direction
-            return count >= 4
-
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        return any(check_direction(dr, dc) for dr, dc in directions)
+        return has_four(self.bitboards[letter])
+
+    def position_key(self):
+        """Return ``(key, mirrored)`` identifying the position up to reflection.
+
+        The key is the smaller of the encodings of the board and of its
+        left-right mirror image; ``mirrored`` tells whether the mirror image
+        was used, so column numbers stored under the key must be reflected.
+        """
+        red = self.bitboards['R']
+        yellow = self.bitboards['Y']
+        key = (red << BOARD_BITS) | yellow
+        mirrored_key = (mirror(red) << BOARD_BITS) | mirror(yellow)
+        if mirrored_key < key:
+            return mirrored_key, True
+        return key, False
+
+    def column_count(self, col, letter):
+        column = (self.bitboards[letter] >> (col * COLUMN_BITS)) & ((1 << ROWS) - 1)
+        return bin(column).count('1')
 
     def available_moves(self):
-        return [col for col in range(self.cols) if self.is_valid_move(col)]
+        return [col for col in range(self.cols) if self.heights[col] < self.rows]
 
     def is_board_full(self):
-        return all(self.board[0][col] != ' ' for col in range(self.cols))
+        return all(height == self.rows for height in self.heights)
 
     def game_over(self):
         return self.current_winner is not None or self.is_board_full()
 
 
-class ConnectFourAI:
-    def __init__(self, difficulty='medium'):
+class ConnectFourAIConfig:
+    """Search settings shared by every ConnectFourAI of one difficulty."""
+
+    shared = True
+
+    __slots__ = ('difficulty', 'max_depth')
+
+    def __init__(self, difficulty, max_depth):
         self.difficulty = difficulty
-        self.max_depth = {'easy': 1, 'medium': 3, 'hard': 5}[difficulty]
+        self.max_depth = max_depth
+
+
+CONNECTFOUR_AI_CONFIGS = {
+    difficulty: ConnectFourAIConfig(difficulty, max_depth)
+    for difficulty, max_depth in {'easy': 1, 'medium': 3, 'hard': 7}.items()
+}
+
+
+class ConnectFourAI:
+    # Columns searched centre-out: central moves are usually best and make
+    # alpha-beta cut off sooner.
+    COLUMN_ORDER = (3, 2, 4, 1, 5, 0, 6)
+
+    __slots__ = ('config', 'tt', 'move_cache', 'stop_requested', 'on_progress', 'nodes', 'cutoffs', 'seldepth',
+                 'search_depth')
+
+    def __init__(self, difficulty='medium', tt_size_mb=1, config=None, move_cache=None):
+        self.config = config or CONNECTFOUR_AI_CONFIGS[difficulty]
+        self.tt = TranspositionTable(tt_size_mb)
+        # optional MoveCache shared between games, keyed by the position up
+        # to reflection like the transposition table
+        self.move_cache = move_cache
+        # set from another thread to stop deepening after the current depth;
+        # on_progress is called with a summary after every completed depth
+        self.stop_requested = False
+        self.on_progress = None
+        # nodes and cutoffs count up for the AI's lifetime; seldepth is the
+        # deepest ply reached by the current search
+        self.nodes = 0
+        self.cutoffs = 0
+        self.seldepth = 0
+        self.search_depth = 0
+
+    @property
+    def difficulty(self):
+        return self.config.difficulty
+
+    @property
+    def max_depth(self):
+        return self.config.max_depth
+
+    def release_memory(self):
+        """Drop the search table; called for games that have gone idle."""
+        self.tt.clear()
 
     def get_move(self, game, ai_letter):
         if self.difficulty == 'easy':
@@ -75,64 +278,116 @@ class ConnectFourAI:
         return random.choice(game.available_moves())
 
     def alpha_beta_move(self, game, ai_letter):
+        """Iteratively deepen to ``max_depth``; each pass seeds the table's move order."""
         player_letter = 'R' if ai_letter == 'Y' else 'Y'
-        _, col = self.alpha_beta(game, self.max_depth, -math.inf, math.inf, True, ai_letter, player_letter)
-        return col if col is not None else random.choice(game.available_moves())
+        self.seldepth = 0
+        last_col = game.cols - 1
+        if self.move_cache is not None:
+            key, mirrored = game.position_key()
+            cache_key = ('connectfour', key, ai_letter, self.difficulty)
+            cached = self.move_cache.get(cache_key)
+            if cached is not None:
+                col = random.choice(cached[1])
+                return last_col - col if mirrored else col
+
+        self.tt.new_search()
+        start = time.perf_counter()
+        start_nodes = self.nodes
+        col = None
+        for depth in range(1, self.max_depth + 1):
+            if depth > 1 and self.stop_requested:
+                break
+            self.search_depth = depth
+            score, col = self.alpha_beta(game, depth, -math.inf, math.inf, True, ai_letter, player_letter)
+            if self.on_progress is not None:
+                self.on_progress({
+                    'depth': depth,
+                    'best_move': col,
+                    'score': score,
+                    'nodes': self.nodes - start_nodes,
+                    'time_ms': round((time.perf_counter() - start) * 1000, 3)
+                })
+        if col is None:
+            return random.choice(game.available_moves())
+        if self.move_cache is not None and self.search_depth == self.max_depth:
+            self.move_cache.put(cache_key, score, [last_col - col if mirrored else col])
+        return col
 
     def alpha_beta(self, game, depth, alpha, beta, maximizing, ai_letter, player_letter):
-        valid_moves = game.available_moves()
-
+        self.nodes += 1
         if depth == 0 or game.game_over():
+            if self.search_depth - depth > self.seldepth:
+                self.seldepth = self.search_depth - depth
             return self.evaluate_board(game, ai_letter, player_letter), None
 
-        if maximizing:
-            max_eval = -math.inf
-            best_col = random.choice(valid_moves)
-            for col in valid_moves:
-                row = game.get_next_open_row(col)
-                game.board[row][col] = ai_letter
+        key, mirrored = game.position_key()
+        key = key * 2 + maximizing
+        last_col = game.cols - 1
+        tt_col = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            _, entry_depth, entry_score, entry_flag, tt_col, _ = entry
+            if tt_col is not None and mirrored:
+                tt_col = last_col - tt_col
+            if entry_depth >= depth:
+                if entry_flag == EXACT:
+                    return entry_score, tt_col
+                elif entry_flag == LOWER:
+                    alpha = max(alpha, entry_score)
+                else:
+                    beta = min(beta, entry_score)
+                if beta <= alpha:
+                    return entry_score, tt_col
 
-                if game.check_winner(row, col, ai_letter):
-                    game.current_winner = ai_letter
+        heights = game.heights
+        valid_moves = [col for col in self.COLUMN_ORDER if heights[col] < game.rows]
+        if tt_col is not None and tt_col in valid_moves:
+            valid_moves.remove(tt_col)
+            valid_moves.insert(0, tt_col)
 
-                eval_score, _ = self.alpha_beta(game, depth-1, alpha, beta, False, ai_letter, player_letter)
+        window_alpha, window_beta = alpha, beta
+        best_col = None
 
-                game.board[row][col] = ' '
-                game.current_winner = None
+        if maximizing:
+            best_eval = -math.inf
+            for col in valid_moves:
+                game.drop(col, ai_letter)
+                eval_score, _ = self.alpha_beta(game, depth-1, alpha, beta, False, ai_letter, player_letter)
+                game.lift(col)
 
-                if eval_score > max_eval:
-                    max_eval = eval_score
+                if eval_score > best_eval:
+                    best_eval = eval_score
                     best_col = col
 
                 alpha = max(alpha, eval_score)
                 if beta <= alpha:
+                    self.cutoffs += 1
                     break
-
-            return max_eval, best_col
         else:
-            min_eval = math.inf
-            best_col = random.choice(valid_moves)
+            best_eval = math.inf
             for col in valid_moves:
-                row = game.get_next_open_row(col)
-                game.board[row][col] = player_letter
-
-                if game.check_winner(row, col, player_letter):
-                    game.current_winner = player_letter
-
+                game.drop(col, player_letter)
                 eval_score, _ = self.alpha_beta(game, depth-1, alpha, beta, True, ai_letter, player_letter)
+                game.lift(col)
 
-                game.board[row][col] = ' '
-                game.current_winner = None
-
-                if eval_score < min_eval:
-                    min_eval = eval_score
+                if eval_score < best_eval:
+                    best_eval = eval_score
                     best_col = col
 
                 beta = min(beta, eval_score)
                 if beta <= alpha:
+                    self.cutoffs += 1
                     break
 
-            return min_eval, best_col
+        if best_eval <= window_alpha:
+            flag = UPPER
+        elif best_eval >= window_beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, best_eval, flag, last_col - best_col if mirrored else best_col)
+
+        return best_eval, best_col
 
     def evaluate_board(self, game, ai_letter, player_letter):
         if game.current_winner == ai_letter:
@@ -140,9 +395,9 @@ class ConnectFourAI:
         elif game.current_winner == player_letter:
             return -1000
 
-        score = 0
+        # threat_score is kept up to date by drop/lift from red's point of view
+        score = game.threat_score if ai_letter == 'R' else -game.threat_score
         center_col = game.cols // 2
-        center_array = [game.board[r][center_col] for r in range(game.rows)]
-        score += center_array.count(ai_letter) * 3
+        score += game.column_count(center_col, ai_letter) * 3
 
         return score
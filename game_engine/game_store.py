@@ -0,0 +1,259 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def estimate_bytes(obj, _seen=None):
+    """Approximate deep size of a game or AI object.
+
+    Follows instance dicts, slots and the built-in containers. Objects that
+    know their own footprint better (transposition tables) are asked for it
+    through a ``memory_bytes()`` method instead of being walked. Objects
+    whose class sets ``shared = True`` (configs and caches used by every
+    game) are not part of any one game and count as nothing.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    if getattr(type(obj), 'shared', False):
+        return 0
+
+    memory_bytes = getattr(obj, 'memory_bytes', None)
+    if callable(memory_bytes) and not isinstance(obj, type):
+        return sys.getsizeof(obj) + memory_bytes()
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += estimate_bytes(key, _seen) + estimate_bytes(value, _seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += estimate_bytes(item, _seen)
+    elif hasattr(obj, '__dict__'):
+        size += estimate_bytes(vars(obj), _seen)
+    for name in getattr(type(obj), '__slots__', ()):
+        if hasattr(obj, name):
+            size += estimate_bytes(getattr(obj, name), _seen)
+    return size
+
+
+class GameStore:
+    """Bounded, thread-safe map of game id to game entry.
+
+    Entries are kept in least-recently-used order. Adding a game beyond
+    ``max_games`` evicts the least recently used one, and games idle for
+    longer than ``idle_ttl`` seconds are evicted whenever the store is
+    touched. Ids of evicted games are remembered (up to ``max_games`` of
+    them) so that callers can tell an expired game from one that never
+    existed.
+
+    Games idle for longer than ``trim_after`` seconds stay in the store but
+    have their AI's search tables released (``ai.release_memory()``), so an
+    idle game costs only its compact board state.
+
+    ``loader(game_id)`` is called on a miss and may return an entry to
+    restore (for example from disk); ``on_evict(game_id, reason)`` is called
+    for every eviction.
+
+    ``tally(entry)`` may return a dict of numbers (or None) for a game; the
+    store keeps their sums per game type in ``totals()``, updated whenever
+    the game is measured, so reading them never walks the games.
+    """
+
+    def __init__(self, max_games=10000, idle_ttl=3600, clock=time.monotonic, trim_after=None,
+                 loader=None, on_evict=None, tally=None):
+        self.max_games = max_games
+        self.idle_ttl = idle_ttl
+        self.trim_after = trim_after
+        self.clock = clock
+        self.loader = loader
+        self.on_evict = on_evict
+        self.tally = tally
+        self._entries = OrderedDict()
+        self._untrimmed = OrderedDict()
+        self._last_access = {}
+        self._memory = {}
+        self._tallies = {}
+        self._totals = {}
+        self._expired = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_bytes = 0
+        self.counts = {}
+        self.evictions = {'lru': 0, 'idle': 0}
+        self.trimmed = 0
+        self.restored = 0
+
+    def __contains__(self, game_id):
+        with self._lock:
+            return game_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, game_id):
+        entry = self.get(game_id)
+        if entry is None:
+            raise KeyError(game_id)
+        return entry
+
+    def __setitem__(self, game_id, entry):
+        self.put(game_id, entry)
+
+    def get(self, game_id):
+        """Return the entry for ``game_id`` and mark it as used, or None."""
+        with self._lock:
+            self._evict_idle()
+            entry = self._entries.get(game_id)
+            if entry is not None:
+                self._entries.move_to_end(game_id)
+                self._last_access[game_id] = self.clock()
+                self._untrimmed[game_id] = None
+                self._untrimmed.move_to_end(game_id)
+                self._measure(game_id, entry)
+                return entry
+
+        if self.loader is None or game_id is None:
+            return None
+        entry = self.loader(game_id)
+        if entry is None:
+            return None
+        with self._lock:
+            # another request may have restored or created it meanwhile
+            if game_id in self._entries:
+                return self._entries[game_id]
+            self._insert(game_id, entry)
+            self.restored += 1
+            return entry
+
+    def put(self, game_id, entry):
+        with self._lock:
+            if game_id in self._entries:
+                self._remove(game_id)
+            self._insert(game_id, entry)
+
+    def refresh(self, game_id):
+        """Re-estimate the memory of ``game_id`` after it has been played on.
+
+        Return its entry, or None if the store does not hold it.
+        """
+        with self._lock:
+            entry = self._entries.get(game_id)
+            if entry is not None:
+                self._measure(game_id, entry)
+            return entry
+
+    def is_expired(self, game_id):
+        with self._lock:
+            return game_id in self._expired
+
+    def values(self):
+        with self._lock:
+            return list(self._entries.values())
+
+    def items(self):
+        with self._lock:
+            return list(self._entries.items())
+
+    def sweep(self):
+        with self._lock:
+            self._evict_idle()
+
+    def totals(self):
+        """Sums of ``tally`` per game type, as of each game's last measure."""
+        with self._lock:
+            return {game_type: dict(totals) for game_type, (_, totals) in self._totals.items()}
+
+    def stats(self):
+        self.sweep()
+        return {
+            'count': len(self._entries),
+            'max_games': self.max_games,
+            'idle_ttl': self.idle_ttl,
+            'by_type': dict(self.counts),
+            'evictions': dict(self.evictions),
+            'trimmed': self.trimmed,
+            'restored': self.restored,
+            'memory_bytes': self.memory_bytes
+        }
+
+    def _insert(self, game_id, entry):
+        # measure first so that a failure leaves the store unchanged
+        self._measure(game_id, entry)
+        self._expired.pop(game_id, None)
+        self._entries[game_id] = entry
+        self._last_access[game_id] = self.clock()
+        self._untrimmed[game_id] = None
+        self.counts[entry['type']] = self.counts.get(entry['type'], 0) + 1
+        self._evict_idle()
+        while len(self._entries) > self.max_games:
+            self._evict(next(iter(self._entries)), 'lru')
+
+    def _measure(self, game_id, entry):
+        size = estimate_bytes(entry['game']) + estimate_bytes(entry['ai'])
+        self.memory_bytes += size - self._memory.get(game_id, 0)
+        self._memory[game_id] = size
+        if self.tally is not None:
+            self._untally(game_id)
+            tally = self.tally(entry)
+            if tally is not None:
+                self._tallies[game_id] = (entry['type'], tally)
+                count, totals = self._totals.get(entry['type'], (0, {}))
+                for name, value in tally.items():
+                    totals[name] = totals.get(name, 0) + value
+                self._totals[entry['type']] = (count + 1, totals)
+
+    def _untally(self, game_id):
+        old = self._tallies.pop(game_id, None)
+        if old is not None:
+            game_type, tally = old
+            count, totals = self._totals[game_type]
+            if count == 1:
+                del self._totals[game_type]
+            else:
+                for name, value in tally.items():
+                    totals[name] -= value
+                self._totals[game_type] = (count - 1, totals)
+
+    def _evict_idle(self):
+        now = self.clock()
+        if self.idle_ttl is not None:
+            cutoff = now - self.idle_ttl
+            while self._entries:
+                game_id = next(iter(self._entries))
+                if self._last_access[game_id] > cutoff:
+                    break
+                self._evict(game_id, 'idle')
+
+        if self.trim_after is not None:
+            cutoff = now - self.trim_after
+            while self._untrimmed:
+                game_id = next(iter(self._untrimmed))
+                if self._last_access[game_id] > cutoff:
+                    break
+                del self._untrimmed[game_id]
+                entry = self._entries[game_id]
+                release_memory = getattr(entry['ai'], 'release_memory', None)
+                if release_memory is not None:
+                    release_memory()
+                    self._measure(game_id, entry)
+                    self.trimmed += 1
+
+    def _evict(self, game_id, reason):
+        self._remove(game_id)
+        self.evictions[reason] += 1
+        if self.on_evict is not None:
+            self.on_evict(game_id, reason)
+        self._expired[game_id] = reason
+        while len(self._expired) > self.max_games:
+            self._expired.popitem(last=False)
+
+    def _remove(self, game_id):
+        entry = self._entries.pop(game_id)
+        self._untrimmed.pop(game_id, None)
+        del self._last_access[game_id]
+        self.memory_bytes -= self._memory.pop(game_id)
+        self._untally(game_id)
+        self.counts[entry['type']] -= 1
@@ -0,0 +1,155 @@
+"""Load test for the game server.
+
+Plays many games at once against a running server and reports how request
+throughput and latency change with the number of concurrent games, along
+with the latency of /api/health polled while the games are running.
+
+    python api.py 8001 &
+    python load_test.py --url http://localhost:8001 --concurrency 1 2 4 8
+
+Pass --spawn to start a server in-process on a free port instead.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.request
+
+
+def post(url, path, payload):
+    request = urllib.request.Request(
+        url + path,
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def get(url, path):
+    with urllib.request.urlopen(url + path) as response:
+        return json.loads(response.read())
+
+
+def play_connectfour(url, game_id, difficulty, moves, latencies):
+    post(url, '/api/connectfour/new', {'game_id': game_id, 'difficulty': difficulty})
+    board = None
+    for _ in range(moves):
+        columns = [col for col in range(7) if board is None or board[0][col] == ' ']
+        start = time.perf_counter()
+        response = post(url, '/api/connectfour/move', {'game_id': game_id, 'col': random.choice(columns)})
+        latencies.append(time.perf_counter() - start)
+        board = response.get('board')
+        if response.get('game_over') or 'error' in response:
+            break
+
+
+def play_tictactoe(url, game_id, difficulty, moves, latencies):
+    post(url, '/api/tictactoe/new', {'game_id': game_id, 'difficulty': difficulty})
+    board = [' '] * 9
+    for _ in range(moves):
+        squares = [i for i, spot in enumerate(board) if spot == ' ']
+        start = time.perf_counter()
+        response = post(url, '/api/tictactoe/move', {'game_id': game_id, 'square': random.choice(squares)})
+        latencies.append(time.perf_counter() - start)
+        board = response.get('board', board)
+        if response.get('game_over') or 'error' in response:
+            break
+
+
+def play_chess(url, game_id, difficulty, moves, latencies):
+    response = post(url, '/api/chess/new', {'game_id': game_id, 'difficulty': difficulty})
+    for _ in range(moves):
+        # move a random white piece to a random legal square
+        board = response['board']
+        pieces = [(r, c) for r in range(8) for c in range(8) if board[r][c].isupper()]
+        random.shuffle(pieces)
+        for from_row, from_col in pieces:
+            targets = post(url, '/api/chess/valid_moves', {'game_id': game_id, 'row': from_row, 'col': from_col})
+            if targets.get('valid_moves'):
+                break
+        else:
+            break
+        to_row, to_col = random.choice(targets['valid_moves'])
+        start = time.perf_counter()
+        response = post(url, '/api/chess/move', {
+            'game_id': game_id, 'from_row': from_row, 'from_col': from_col, 'to_row': to_row, 'to_col': to_col
+        })
+        latencies.append(time.perf_counter() - start)
+        if response.get('game_over'):
+            break
+
+
+PLAYERS = {
+    'connectfour': play_connectfour,
+    'tictactoe': play_tictactoe,
+    'chess': play_chess,
+}
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_level(url, game, difficulty, concurrency, moves):
+    latencies = []
+    health_latencies = []
+    done = threading.Event()
+
+    def poll_health():
+        while not done.is_set():
+            start = time.perf_counter()
+            get(url, '/api/health')
+            health_latencies.append(time.perf_counter() - start)
+            time.sleep(0.05)
+
+    player = PLAYERS[game]
+    threads = [
+        threading.Thread(target=player, args=(url, f'load_{game}_{concurrency}_{i}', difficulty, moves, latencies))
+        for i in range(concurrency)
+    ]
+    poller = threading.Thread(target=poll_health)
+    start = time.perf_counter()
+    poller.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    poller.join()
+
+    print(f'{concurrency:4d} games  {len(latencies):6d} moves  {len(latencies) / elapsed:8.1f} moves/s  '
+          f'p50 {percentile(latencies, 0.5) * 1000:7.1f} ms  p99 {percentile(latencies, 0.99) * 1000:7.1f} ms  '
+          f'health p99 {percentile(health_latencies, 0.99) * 1000:6.1f} ms')
+
+
+def spawn_server():
+    from api import GameAPIHandler, GameHTTPServer
+
+    server = GameHTTPServer(('127.0.0.1', 0), GameAPIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8001')
+    parser.add_argument('--spawn', action='store_true', help='start a server in this process')
+    parser.add_argument('--game', choices=sorted(PLAYERS), default='connectfour')
+    parser.add_argument('--difficulty', default='medium')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--moves', type=int, default=10, help='moves per game')
+    args = parser.parse_args()
+
+    url = spawn_server() if args.spawn else args.url
+    for concurrency in args.concurrency:
+        run_level(url, args.game, args.difficulty, concurrency, args.moves)
+
+
+if __name__ == '__main__':
+    main()
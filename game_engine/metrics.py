@@ -0,0 +1,98 @@
+import bisect
+import threading
+
+# Upper bounds of the latency histogram buckets, in milliseconds; anything
+# slower lands in a final overflow bucket.
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; recording is a bisect and an increment."""
+
+    __slots__ = ('counts', 'count', 'sum_ms', 'max_ms')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples,
+        capped at the slowest sample seen."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, round(self.max_ms, 3))
+        return round(self.max_ms, 3)
+
+    def snapshot(self):
+        buckets = {f'le_{bound}': count for bound, count in zip(BUCKETS_MS, self.counts)}
+        buckets['inf'] = self.counts[-1]
+        return {
+            'count': self.count,
+            'mean_ms': round(self.sum_ms / self.count, 3) if self.count else None,
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': self.percentile(0.5),
+            'p90_ms': self.percentile(0.9),
+            'p99_ms': self.percentile(0.99),
+            'buckets': buckets
+        }
+
+
+class SearchMetrics:
+    """Move latency and search counters per game type and difficulty."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def record(self, game_type, difficulty, request_ms, stats=None):
+        with self._lock:
+            series = self._series.get((game_type, difficulty))
+            if series is None:
+                series = self._series[(game_type, difficulty)] = {
+                    'request': LatencyHistogram(),
+                    'search': LatencyHistogram(),
+                    'searches': 0,
+                    'nodes': 0,
+                    'cutoffs': 0,
+                    'tt_hits': 0,
+                    'max_depth_reached': 0
+                }
+            series['request'].observe(request_ms)
+            if stats is not None:
+                series['search'].observe(stats['time_ms'])
+                series['searches'] += 1
+                series['nodes'] += stats['nodes']
+                series['cutoffs'] += stats['cutoffs']
+                series['tt_hits'] += stats.get('tt_hits', 0)
+                series['max_depth_reached'] = max(series['max_depth_reached'], stats['max_depth_reached'])
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for (game_type, difficulty), series in sorted(self._series.items()):
+                search_seconds = series['search'].sum_ms / 1000
+                result.setdefault(game_type, {})[difficulty] = {
+                    'request_latency': series['request'].snapshot(),
+                    'search_latency': series['search'].snapshot(),
+                    'searches': series['searches'],
+                    'nodes': series['nodes'],
+                    'cutoffs': series['cutoffs'],
+                    'tt_hits': series['tt_hits'],
+                    'max_depth_reached': series['max_depth_reached'],
+                    'nps': round(series['nodes'] / search_seconds) if search_seconds else 0
+                }
+            return result
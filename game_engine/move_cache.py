@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+
+
+class MoveCache:
+    """Search results shared by every game, keyed by
+    ``(game type, position, side to move, difficulty)``.
+
+    Each entry holds the score and every move that tied for it, so callers
+    still pick among them at random. Entries are kept in least-recently-used
+    order and the oldest is dropped once ``max_entries`` are held. Hits and
+    misses are counted per game type.
+    """
+
+    # one cache serves every game, so GameStore does not bill it to any
+    shared = True
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.hits = {}
+        self.misses = {}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key):
+        """Return ``(score, moves)`` stored for ``key``, or None."""
+        game_type = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses[game_type] = self.misses.get(game_type, 0) + 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits[game_type] = self.hits.get(game_type, 0) + 1
+            return entry
+
+    def put(self, key, score, moves):
+        with self._lock:
+            self._entries[key] = (score, tuple(moves))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            by_type = {}
+            for game_type in sorted(set(self.hits) | set(self.misses)):
+                hits = self.hits.get(game_type, 0)
+                misses = self.misses.get(game_type, 0)
+                by_type[game_type] = {'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses)}
+            hits = sum(self.hits.values())
+            lookups = hits + sum(self.misses.values())
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'evictions': self.evictions,
+                'hits': hits,
+                'misses': lookups - hits,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'by_type': by_type
+            }
@@ -0,0 +1,140 @@
+import mmap
+import os
+import random
+import struct
+import sys
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chess_book.bin')
+
+# File layout: a header, then fixed-size records sorted by position key so a
+# lookup is a binary search over the memory-mapped file and nothing is parsed
+# up front. The header stores the Zobrist key of the starting position; a
+# book written with different hash keys is ignored rather than misread.
+HEADER = struct.Struct('<4sHHIQ')
+RECORD = struct.Struct('<QHH')
+MAGIC = b'CBK1'
+VERSION = 1
+
+# Main lines of common openings with a popularity weight. Moves reached by
+# several lines (or transpositions) add up their weights.
+OPENING_LINES = [
+    ('e2e4 e7e5 g1f3 b8c6 f1b5 a7a6 b5a4 g8f6', 10),
+    ('e2e4 e7e5 g1f3 b8c6 f1c4 f8c5 c2c3 g8f6', 8),
+    ('e2e4 e7e5 g1f3 b8c6 f1c4 g8f6 d2d3 f8e7', 4),
+    ('e2e4 e7e5 g1f3 b8c6 d2d4 e5d4 f3d4 g8f6', 4),
+    ('e2e4 e7e5 g1f3 g8f6 f3e5 d7d6 e5f3 f6e4', 3),
+    ('e2e4 e7e5 b1c3 g8f6 f2f4 d7d5', 2),
+    ('e2e4 c7c5 g1f3 d7d6 d2d4 c5d4 f3d4 g8f6 b1c3 a7a6', 10),
+    ('e2e4 c7c5 g1f3 b8c6 d2d4 c5d4 f3d4 g8f6 b1c3 e7e5', 5),
+    ('e2e4 c7c5 g1f3 e7e6 d2d4 c5d4 f3d4 a7a6', 4),
+    ('e2e4 c7c5 b1c3 b8c6 g2g3 g7g6 f1g2 f8g7', 3),
+    ('e2e4 c7c5 c2c3 d7d5 e4d5 d8d5 d2d4 g8f6', 3),
+    ('e2e4 e7e6 d2d4 d7d5 b1c3 g8f6 c1g5 f8e7', 5),
+    ('e2e4 e7e6 d2d4 d7d5 e4e5 c7c5 c2c3 b8c6', 4),
+    ('e2e4 c7c6 d2d4 d7d5 b1c3 d5e4 c3e4 c8f5', 5),
+    ('e2e4 c7c6 d2d4 d7d5 e4e5 c8f5 g1f3 e7e6', 3),
+    ('e2e4 d7d6 d2d4 g8f6 b1c3 g7g6', 2),
+    ('e2e4 d7d5 e4d5 d8d5 b1c3 d5a5 d2d4 g8f6', 2),
+    ('d2d4 d7d5 c2c4 e7e6 b1c3 g8f6 c1g5 f8e7', 8),
+    ('d2d4 d7d5 c2c4 d5c4 g1f3 g8f6 e2e3 e7e6', 4),
+    ('d2d4 d7d5 c2c4 c7c6 g1f3 g8f6 b1c3 d5c4', 6),
+    ('d2d4 g8f6 c2c4 g7g6 b1c3 f8g7 e2e4 d7d6', 6),
+    ('d2d4 g8f6 c2c4 e7e6 b1c3 f8b4 e2e3', 6),
+    ('d2d4 g8f6 c2c4 e7e6 g1f3 b7b6 g2g3 c8b7', 4),
+    ('d2d4 g8f6 c2c4 g7g6 b1c3 d7d5 c4d5 f6d5 e2e4 d5c3 b2c3', 4),
+    ('d2d4 d7d5 g1f3 g8f6 c1f4 e7e6 e2e3 c7c5', 3),
+    ('d2d4 f7f5 g2g3 g8f6 f1g2 e7e6 g1f3', 2),
+    ('c2c4 e7e5 b1c3 g8f6 g1f3 b8c6 g2g3', 4),
+    ('c2c4 c7c5 g1f3 g8f6 b1c3 b8c6', 3),
+    ('g1f3 d7d5 g2g3 g8f6 f1g2 c7c6', 3),
+    ('g1f3 g8f6 c2c4 e7e6 b1c3 d7d5', 2),
+]
+
+
+def parse_square(name):
+    """``'e2'`` -> ``(6, 4)``; row 0 is black's back rank."""
+    return 8 - int(name[1]), ord(name[0]) - ord('a')
+
+
+def encode_move(move):
+    from_row, from_col, to_row, to_col = move
+    return (from_row * 8 + from_col) << 6 | (to_row * 8 + to_col)
+
+
+def decode_move(code):
+    from_square, to_square = code >> 6, code & 63
+    return from_square // 8, from_square % 8, to_square // 8, to_square % 8
+
+
+class OpeningBook:
+    """Read-only view of a book file; positions are looked up on demand."""
+
+    def __init__(self, path, start_key):
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, self.count, book_start_key = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f'{path} is not a version {VERSION} opening book')
+        # a book built with other hash keys would return moves for the wrong positions
+        self.valid = book_start_key == start_key
+
+    def _key_at(self, index):
+        return RECORD.unpack_from(self._data, HEADER.size + index * RECORD.size)[0]
+
+    def probe(self, key):
+        """Return ``[(move, weight), ...]`` stored for ``key``."""
+        if not self.valid:
+            return []
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        moves = []
+        for index in range(low, self.count):
+            record_key, code, weight = RECORD.unpack_from(self._data, HEADER.size + index * RECORD.size)
+            if record_key != key:
+                break
+            moves.append((decode_move(code), weight))
+        return moves
+
+    def choose(self, key):
+        """Pick a book move for ``key`` at random by weight, or None."""
+        moves = self.probe(key)
+        if not moves:
+            return None
+        return random.choices([move for move, _ in moves], [weight for _, weight in moves])[0]
+
+
+def build_book(lines=OPENING_LINES):
+    """Play every line from the start and sum weights per (position, move)."""
+    from chess import Chess
+
+    weights = {}
+    for line, weight in lines:
+        game = Chess()
+        for name in line.split():
+            move = parse_square(name[:2]) + parse_square(name[2:])
+            if move not in game.get_all_valid_moves_for_color(game.current_turn == 'white'):
+                raise ValueError(f'illegal book move {name} in {line!r}')
+            entry = (game.zobrist_key, encode_move(move))
+            weights[entry] = weights.get(entry, 0) + weight
+            game.push(move)
+    return Chess().zobrist_key, weights
+
+
+def write_book(path=BOOK_PATH, lines=OPENING_LINES):
+    start_key, weights = build_book(lines)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, len(weights), start_key))
+        for (key, code), weight in sorted(weights.items()):
+            f.write(RECORD.pack(key, code, min(weight, 0xFFFF)))
+    return len(weights)
+
+
+if __name__ == '__main__':
+    if '--generate' in sys.argv:
+        count = write_book()
+        print(f'wrote {count} book moves to {BOOK_PATH}')
@@ -0,0 +1,135 @@
+import json
+import sqlite3
+import threading
+
+
+class GameSnapshots:
+    """Game snapshots in a local SQLite file, written in batches.
+
+    ``save`` and ``delete`` only record the latest snapshot for a game in
+    memory; a background thread writes everything pending in one
+    transaction every ``flush_interval`` seconds, or sooner once
+    ``batch_size`` games are waiting. Several moves in the same game between
+    flushes therefore cost a single row write. ``load`` reads one game on
+    demand, so opening a file holding many games is instant.
+
+    Besides the game state each row keeps the game's settings (a JSON
+    object, empty for rows written before settings were stored).
+    """
+
+    def __init__(self, path, flush_interval=0.5, batch_size=1000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS games ('
+            'game_id TEXT PRIMARY KEY, type TEXT NOT NULL, difficulty TEXT NOT NULL, state TEXT NOT NULL, '
+            "settings TEXT NOT NULL DEFAULT '{}'"
+            ') WITHOUT ROWID'
+        )
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(games)')]
+        if 'settings' not in columns:
+            self._conn.execute("ALTER TABLE games ADD COLUMN settings TEXT NOT NULL DEFAULT '{}'")
+        self._db_lock = threading.Lock()
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self.rows_written = 0
+        self.rows_deleted = 0
+        self.bytes_written = 0
+        self.batches = 0
+        self._thread = threading.Thread(target=self._run, name='snapshot-writer', daemon=True)
+        self._thread.start()
+
+    def save(self, game_id, game_type, difficulty, state, settings=None):
+        row = (game_id, game_type, difficulty, json.dumps(state, separators=(',', ':')),
+               json.dumps(settings or {}, separators=(',', ':')))
+        with self._cond:
+            self._pending[game_id] = row
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def delete(self, game_id):
+        with self._cond:
+            self._pending[game_id] = None
+
+    def load(self, game_id):
+        """Return ``(game_type, difficulty, state, settings)`` for ``game_id``, or None."""
+        with self._cond:
+            if game_id in self._pending:
+                row = self._pending[game_id]
+                return None if row is None else (row[1], row[2], json.loads(row[3]), json.loads(row[4]))
+        with self._db_lock:
+            row = self._conn.execute(
+                'SELECT type, difficulty, state, settings FROM games WHERE game_id = ?', (game_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2]), json.loads(row[3])
+
+    def count(self):
+        with self._db_lock:
+            return self._conn.execute('SELECT COUNT(*) FROM games').fetchone()[0]
+
+    def flush(self):
+        # hold the database lock across the swap so that a concurrent load
+        # never misses a snapshot that has left _pending but is not yet stored
+        with self._db_lock:
+            with self._cond:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            upserts = [row for row in pending.values() if row is not None]
+            deletes = [(game_id,) for game_id, row in pending.items() if row is None]
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany('INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?)', upserts)
+                self._conn.executemany('DELETE FROM games WHERE game_id = ?', deletes)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                # keep the rows for the next attempt unless newer ones arrived
+                with self._cond:
+                    for game_id, row in pending.items():
+                        self._pending.setdefault(game_id, row)
+                raise
+            self.rows_written += len(upserts)
+            self.rows_deleted += len(deletes)
+            self.bytes_written += sum(sum(len(field) for field in row) for row in upserts)
+            self.batches += 1
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            'pending': pending,
+            'rows_written': self.rows_written,
+            'rows_deleted': self.rows_deleted,
+            'bytes_written': self.bytes_written,
+            'batches': self.batches
+        }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print('Warning: failed to write game snapshots:', e)
+            if closed:
+                return
@@ -0,0 +1,230 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from chess import Chess, ChessAI
+from connectfour import ConnectFour, ConnectFourAI
+
+
+class PonderJob:
+    """Background search of one game's positions after each possible reply.
+
+    The job searches with its own AI object that shares the game AI's
+    transposition table, so even a reply it did not finish leaves useful
+    entries behind. Finished replies are kept in ``answers`` by position key.
+
+    Only chess searches can be interrupted part way (``ChessAI.stop_requested``);
+    a Connect Four search always runs to the end.
+    """
+
+    def __init__(self, ai, positions, think):
+        self.ai = ai
+        self.positions = positions
+        self.think = think
+        self.answers = {}
+        self.cancelled = threading.Event()
+        self.future = None
+
+    def answer(self, key):
+        return self.answers.get(key)
+
+    def interrupt(self, stop=True):
+        if isinstance(self.ai, ChessAI):
+            self.ai.stop_requested = stop
+
+
+def chess_job(game, ai, ai_is_white, think_ms=None):
+    """Ponder every reply to the AI's last move, the predicted one first.
+
+    The predicted reply is the best move the AI's own search stored for the
+    current position; the rest follow in the AI's usual move order.
+    """
+    ponder_ai = ChessAI(config=ai.config, move_cache=ai.move_cache)
+    ponder_ai.tt = ai.tt
+    entry = ai.tt.probe(game.zobrist_key)
+    moves = game.get_all_valid_moves_for_color(not ai_is_white)
+    moves = ponder_ai.order_moves(game, moves, entry[4] if entry is not None else None, 0)
+    state = game.to_state()
+
+    def positions():
+        for move in moves:
+            position = Chess.from_state(state)
+            position.push(move)
+            position.update_result()
+            if not position.game_over():
+                yield position.zobrist_key, position
+
+    def think(position):
+        move = ponder_ai.get_move(position, ai_is_white, think_ms)
+        # an interrupted search only got part of the way; search it again
+        return None if ponder_ai.stop_requested else move
+
+    return PonderJob(ponder_ai, positions(), think)
+
+
+def connectfour_job(game, ai, ai_letter):
+    """Ponder every column the opponent can play, centre columns first."""
+    ponder_ai = ConnectFourAI(config=ai.config, move_cache=ai.move_cache)
+    ponder_ai.tt = ai.tt
+    player_letter = 'R' if ai_letter == 'Y' else 'Y'
+    cols = [col for col in ConnectFourAI.COLUMN_ORDER if game.is_valid_move(col)]
+    state = game.to_state()
+
+    def positions():
+        for col in cols:
+            position = ConnectFour.from_state(state)
+            position.make_move(col, player_letter)
+            if not position.game_over():
+                yield connectfour_key(position), position
+
+    def think(position):
+        return ponder_ai.get_move(position, ai_letter)
+
+    return PonderJob(ponder_ai, positions(), think)
+
+
+def connectfour_key(game):
+    return game.bitboards['R'], game.bitboards['Y']
+
+
+class Ponderer:
+    """Runs ponder jobs on a small pool of their own, below foreground searches.
+
+    At most ``threads`` jobs run at once and each gets ``budget_ms`` of
+    search time. While any foreground search is running (see
+    ``foreground``) jobs do not start new searches, and chess searches in
+    progress are interrupted and redone afterwards, so pondering only uses
+    time no request is waiting for.
+    """
+
+    def __init__(self, threads=1, budget_ms=3000):
+        self.threads = threads
+        self.budget_ms = budget_ms
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='ponder') if threads else None
+        self._condition = threading.Condition()
+        self._active = 0
+        self._jobs = {}
+        self._running = set()
+        self.started = 0
+        self.searches = 0
+        self.interrupted = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self._executor is not None
+
+    def start(self, game_id, job):
+        """Start pondering ``game_id``, replacing any job it already has."""
+        if not self.enabled:
+            return
+        self.stop(game_id)
+        with self._condition:
+            self._jobs[game_id] = job
+            self.started += 1
+        job.future = self._executor.submit(self._run, job)
+
+    def stop(self, game_id, wait=True):
+        """Cancel ``game_id``'s job and wait for it; returns the job or None.
+
+        Must be called (waiting) before the game's AI is used again, since
+        the job shares its transposition table.
+        """
+        with self._condition:
+            job = self._jobs.pop(game_id, None)
+            if job is None:
+                return None
+            job.cancelled.set()
+            job.interrupt()
+            self._condition.notify_all()
+        if wait and job.future is not None and not job.future.cancel():
+            job.future.result()
+        return job
+
+    def take(self, game_id, key):
+        """Stop ``game_id``'s job and return its answer for ``key``, if any."""
+        job = self.stop(game_id)
+        if job is None:
+            return None
+        move = job.answer(key)
+        with self._condition:
+            if move is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return move
+
+    @contextmanager
+    def foreground(self):
+        """Hold back ponder jobs while a request's search runs."""
+        with self._condition:
+            self._active += 1
+            for job in self._running:
+                job.interrupt()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                if not self._active:
+                    self._condition.notify_all()
+
+    def _wait_idle(self, job):
+        """Block until no foreground search runs; False if ``job`` was cancelled."""
+        with self._condition:
+            while self._active and not job.cancelled.is_set():
+                self._condition.wait()
+            if job.cancelled.is_set():
+                return False
+            job.interrupt(False)
+            self._running.add(job)
+            return True
+
+    def _run(self, job):
+        spent = 0.0
+        try:
+            for key, position in job.positions:
+                while spent * 1000 < self.budget_ms:
+                    if not self._wait_idle(job):
+                        return
+                    start = time.perf_counter()
+                    move = job.think(position)
+                    spent += time.perf_counter() - start
+                    with self._condition:
+                        self._running.discard(job)
+                        self.searches += 1
+                    if job.cancelled.is_set():
+                        return
+                    if move is not None:
+                        job.answers[key] = move
+                        break
+                    with self._condition:
+                        self.interrupted += 1
+                else:
+                    return
+        finally:
+            with self._condition:
+                self._running.discard(job)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'threads': self.threads,
+                'budget_ms': self.budget_ms,
+                'jobs': len(self._jobs),
+                'started': self.started,
+                'searches': self.searches,
+                'interrupted': self.interrupted,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def shutdown(self):
+        with self._condition:
+            game_ids = list(self._jobs)
+        for game_id in game_ids:
+            self.stop(game_id)
+        if self._executor is not None:
+            self._executor.shutdown()
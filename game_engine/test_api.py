@@ -0,0 +1,83 @@
+"""Tests of the HTTP handlers' request checks. Run from the game_engine
+directory with ``python -m pytest test_api.py``."""
+import os
+import tempfile
+import unittest
+
+os.environ['GAME_SNAPSHOT_PATH'] = ''
+os.environ.setdefault('PONDER_THREADS', '0')
+
+import api
+from chess import Chess, ChessAI
+from persistence import GameSnapshots
+
+
+class ChessMoveTest(unittest.TestCase):
+    def setUp(self):
+        self.handler = api.GameAPIHandler.__new__(api.GameAPIHandler)
+        self.handler.dispatch_post('/api/chess/new', {'game_id': 'api_test', 'difficulty': 'easy'})
+
+    def move(self, **fields):
+        move = {'game_id': 'api_test', 'from_row': 6, 'from_col': 4, 'to_row': 4, 'to_col': 4}
+        move.update(fields)
+        return self.handler.dispatch_post('/api/chess/move', move)
+
+    def test_bad_think_ms_leaves_game_unchanged(self):
+        for think_ms in ('fast', -1, True):
+            with self.assertRaises(api.BadRequest):
+                self.move(think_ms=think_ms)
+        game = api.games.get('api_test')['game']
+        self.assertEqual(game.current_turn, 'white')
+        self.assertEqual(game.move_stack, [])
+
+        response = self.move(think_ms=50)
+        self.assertNotIn('error', response)
+        self.assertEqual(response['current_turn'], 'white')
+
+    def test_promotion_ignored_for_normal_move(self):
+        response = self.move(promotion='Q')
+        self.assertNotIn('error', response)
+        self.assertEqual(response['board'][4][4], 'P')
+
+    def test_bad_promotion_letter(self):
+        for promotion in ('K', 'x', 'QQ', 5):
+            with self.assertRaises(api.BadRequest):
+                self.move(promotion=promotion)
+        self.assertEqual(api.games.get('api_test')['game'].move_stack, [])
+
+    def test_underpromotion(self):
+        api.games.get('api_test')['game'] = Chess.from_fen('8/P6k/8/8/8/8/8/K7 w - - 0 1')
+        response = self.move(from_row=1, from_col=0, to_row=0, to_col=0, promotion='n')
+        self.assertEqual(response['board'][0][0], 'N')
+
+
+class RestoreTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        api.snapshots = GameSnapshots(os.path.join(self.dir.name, 'games.sqlite3'))
+        self.handler = api.GameAPIHandler.__new__(api.GameAPIHandler)
+
+    def tearDown(self):
+        api.snapshots.close()
+        api.snapshots = None
+        self.dir.cleanup()
+
+    def test_restored_game_keeps_its_settings(self):
+        self.handler.dispatch_post('/api/chess/new', {'game_id': 'restore_test', 'difficulty': 'easy',
+                                                      'tt_size_mb': 2, 'ponder': True})
+        api.save_game('restore_test')
+        restored = api.restore_game('restore_test')
+        self.assertTrue(restored['ponder'])
+        self.assertEqual(restored['settings'], {'tt_size_mb': 2, 'search_workers': api.CHESS_SEARCH_WORKERS})
+        self.assertEqual(restored['ai'].tt.size, ChessAI('easy', 2).tt.size)
+        self.assertEqual(restored['ai'].workers, api.CHESS_SEARCH_WORKERS)
+
+    def test_game_saved_without_settings_gets_new_game_defaults(self):
+        api.snapshots.save('old_game', 'connectfour', 'easy', api.ConnectFour().to_state())
+        restored = api.restore_game('old_game')
+        self.assertFalse(restored['ponder'])
+        self.assertEqual(restored['ai'].tt.size, api.ConnectFourAI('easy').tt.size)
+
+
+if __name__ == '__main__':
+    unittest.main()
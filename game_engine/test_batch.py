@@ -0,0 +1,44 @@
+"""Regression tests for /api/batch error handling. Run from the game_engine
+directory with ``python -m pytest test_batch.py``."""
+import os
+import unittest
+
+os.environ['GAME_SNAPSHOT_PATH'] = ''
+os.environ.setdefault('PONDER_THREADS', '0')
+
+import api
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.handler = api.GameAPIHandler.__new__(api.GameAPIHandler)
+        self.handler.dispatch_post('/api/connectfour/new', {'game_id': 'batch_test', 'difficulty': 'easy'})
+        self.saved = []
+        self.save_game = api.save_game
+        api.save_game = self.saved.append
+
+    def tearDown(self):
+        api.save_game = self.save_game
+
+    def test_invalid_item_fails_alone(self):
+        response = self.handler.handle_batch({'items': [
+            {'game_id': 'batch_test', 'col': 3},
+            {'game_id': 'batch_test', 'col': 'x'},
+            {'game_id': 'batch_test', 'moves': [{'col': 2}, {'col': 'x'}, {'col': 4}]},
+        ]})
+        first, bad, sequence = response['results']
+        self.assertNotIn('error', first)
+        self.assertIn('error', bad)
+        self.assertNotIn('error', sequence['results'][0])
+        self.assertIn('error', sequence['results'][1])
+        # the sequence stops at its first error
+        self.assertEqual(len(sequence['results']), 2)
+
+        # two player moves and two AI replies were played and saved
+        board = api.games.get('batch_test')['game'].get_board()
+        self.assertEqual(sum(cell != ' ' for row in board for cell in row), 4)
+        self.assertEqual(self.saved, ['batch_test'])
+
+
+if __name__ == '__main__':
+    unittest.main()
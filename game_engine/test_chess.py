@@ -0,0 +1,78 @@
+"""Tests of chess move generation and search. Run from the game_engine
+directory with ``python -m pytest test_chess.py``."""
+import math
+import unittest
+
+from bench_suite import CHESS_PERFT, perft_chess
+from chess import Chess, ChessAI, ChessAIConfig
+
+
+class MoveGenerationTest(unittest.TestCase):
+    def test_perft(self):
+        for name, (fen, counts) in CHESS_PERFT.items():
+            for depth in (1, 2, 3):
+                with self.subTest(position=name, depth=depth):
+                    game = Chess.from_fen(fen)
+                    state, key = game.to_state(), game.zobrist_key
+                    self.assertEqual(perft_chess(game, depth), counts[depth - 1])
+                    # push/pop left the position exactly as it was
+                    self.assertEqual(game.to_state(), state)
+                    self.assertEqual(game.zobrist_key, key)
+
+    def test_castling_through_check(self):
+        game = Chess.from_fen('r3k2r/8/8/8/8/8/5r2/R3K2R w KQkq - 0 1')
+        self.assertFalse(game.make_move(7, 4, 7, 6))
+        self.assertTrue(game.make_move(7, 4, 7, 2))
+        self.assertEqual(game.get_board()[7][:5], [' ', ' ', 'K', 'R', ' '])
+
+    def test_en_passant(self):
+        game = Chess.from_fen('4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1')
+        self.assertTrue(game.make_move(3, 4, 2, 3))
+        self.assertEqual(game.get_board()[3][3], ' ')
+        self.assertEqual(game.get_board()[2][3], 'P')
+
+    def test_promotion(self):
+        game = Chess.from_fen('8/P6k/8/8/8/8/8/K7 w - - 0 1')
+        self.assertFalse(game.make_move(1, 0, 0, 0, 'K'))
+        self.assertTrue(game.make_move(1, 0, 0, 0, 'r'))
+        self.assertEqual(game.get_board()[0][0], 'R')
+
+    def test_promotion_ignored_for_other_moves(self):
+        game = Chess()
+        self.assertTrue(game.make_move(6, 4, 4, 4, 'Q'))
+        self.assertEqual(game.get_board()[4][4], 'P')
+
+    def test_checkmate_ends_game(self):
+        game = Chess()
+        for move in [(6, 5, 5, 5), (1, 4, 3, 4), (6, 6, 4, 6), (0, 3, 4, 7)]:
+            self.assertTrue(game.make_move(*move))
+        self.assertEqual(game.current_winner, 'black')
+        self.assertTrue(game.game_over())
+
+
+class MateScoreTest(unittest.TestCase):
+    # white mates in two: Rd8+ Rxd8 Rxd8#
+    FEN = '2r3k1/5ppp/8/8/8/8/3R1PPP/3R2K1 w - - 0 1'
+
+    def setUp(self):
+        self.ai = ChessAI(config=ChessAIConfig('hard', 4, 10 ** 9, use_book=False, quiescence=False))
+        self.game = Chess.from_fen(self.FEN)
+        self.ai.new_search()
+        self.value, self.moves = self.ai.search_root(self.game, self.game.get_all_valid_moves_for_color(True), 4, True)
+
+    def test_mate_distance_from_root(self):
+        self.assertEqual(self.value, ChessAI.MATE_SCORE - 3)
+        self.assertEqual(self.moves, [(6, 3, 0, 3)])
+
+    def test_table_entry_reused_at_another_ply(self):
+        self.game.push((6, 3, 0, 3))
+        # stored one ply from the root: mated two plies after this position
+        self.assertEqual(self.ai.tt.probe(self.game.zobrist_key)[2], ChessAI.MATE_SCORE - 2)
+        # reached three plies from a root, the same mate is five plies away
+        self.ai.root_ply = len(self.game.move_stack) - 3
+        value = self.ai.minimax(self.game, 3, -math.inf, math.inf, False)
+        self.assertEqual(value, ChessAI.MATE_SCORE - 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""Tests of the Connect Four board. Run from the game_engine directory with
+``python -m pytest test_connectfour.py``."""
+import unittest
+
+from connectfour import ConnectFour
+
+
+class BoardTest(unittest.TestCase):
+    def test_unknown_letter_leaves_board_unchanged(self):
+        game = ConnectFour()
+        game.make_move(3, 'R')
+        state = game.to_state()
+        self.assertFalse(game.make_move(3, 'X'))
+        self.assertFalse(game.make_move(7, 'Y'))
+        self.assertEqual(game.to_state(), state)
+        self.assertEqual(list(game.heights), [0, 0, 0, 1, 0, 0, 0])
+        self.assertTrue(game.make_move(3, 'Y'))
+        self.assertEqual(game.get_board()[4][3], 'Y')
+
+    def test_full_column(self):
+        game = ConnectFour()
+        for letter in 'RYRYRY':
+            self.assertTrue(game.make_move(0, letter))
+        self.assertFalse(game.make_move(0, 'R'))
+
+    def test_four_in_a_row_wins(self):
+        game = ConnectFour()
+        for col in range(3):
+            game.make_move(col, 'R')
+            game.make_move(col, 'Y')
+        self.assertIsNone(game.current_winner)
+        game.make_move(3, 'R')
+        self.assertEqual(game.current_winner, 'R')
+        self.assertTrue(game.game_over())
+
+    def test_drop_and_lift_restore_the_position(self):
+        game = ConnectFour()
+        for col, letter in [(3, 'R'), (3, 'Y'), (2, 'R')]:
+            game.make_move(col, letter)
+        state, threat = game.to_state(), game.threat_score
+        game.drop(4, 'Y')
+        game.lift(4)
+        self.assertEqual(game.to_state(), state)
+        self.assertEqual(game.threat_score, threat)
+        self.assertEqual(ConnectFour.from_state(state).get_board(), game.get_board())
+
+
+if __name__ == '__main__':
+    unittest.main()
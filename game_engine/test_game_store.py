@@ -0,0 +1,125 @@
+"""Tests of GameStore. Run from the game_engine directory with
+``python -m pytest test_game_store.py``."""
+import unittest
+
+from game_store import GameStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def entry(game_type='chess', **tally):
+    return {'game': [], 'ai': None, 'type': game_type, 'tally': tally or None}
+
+
+class TotalsTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.store = GameStore(max_games=2, idle_ttl=10, clock=self.clock, tally=lambda e: e['tally'])
+
+    def test_totals_follow_puts_refreshes_and_evictions(self):
+        self.store['a'] = entry(hits=1, misses=2)
+        self.store['b'] = entry(hits=3, misses=4)
+        self.store['c'] = entry('connectfour', hits=5, misses=0)
+        # 'a' was evicted as least recently used
+        self.assertEqual(self.store.totals(), {'chess': {'hits': 3, 'misses': 4},
+                                               'connectfour': {'hits': 5, 'misses': 0}})
+
+        self.store.get('b')['tally'] = {'hits': 10, 'misses': 4}
+        self.store.refresh('b')
+        self.assertEqual(self.store.totals()['chess'], {'hits': 10, 'misses': 4})
+
+        self.clock.now = 11
+        self.store.sweep()
+        self.assertEqual(self.store.totals(), {})
+
+    def test_entries_without_tally_are_skipped(self):
+        self.store['a'] = entry('tictactoe')
+        self.assertEqual(self.store.totals(), {})
+
+
+class AI:
+    def __init__(self):
+        self.released = False
+
+    def release_memory(self):
+        self.released = True
+
+
+class EvictionTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.evicted = []
+        self.store = GameStore(max_games=3, idle_ttl=100, clock=self.clock, trim_after=10,
+                               on_evict=lambda game_id, reason: self.evicted.append((game_id, reason)))
+
+    def test_least_recently_used_is_evicted(self):
+        for game_id in 'abc':
+            self.store[game_id] = {'game': [], 'ai': AI(), 'type': 'chess'}
+        self.store.get('a')
+        self.store['d'] = {'game': [], 'ai': AI(), 'type': 'chess'}
+        self.assertEqual(self.evicted, [('b', 'lru')])
+        self.assertNotIn('b', self.store)
+        self.assertTrue(self.store.is_expired('b'))
+        self.assertFalse(self.store.is_expired('never'))
+        self.assertEqual(self.store.stats()['by_type'], {'chess': 3})
+
+    def test_idle_games_expire(self):
+        self.store['a'] = {'game': [], 'ai': AI(), 'type': 'chess'}
+        self.clock.now = 60
+        self.store['b'] = {'game': [], 'ai': AI(), 'type': 'connectfour'}
+        self.clock.now = 101
+        self.assertIsNone(self.store.get('a'))
+        self.assertIsNotNone(self.store.get('b'))
+        self.assertEqual(self.evicted, [('a', 'idle')])
+        self.assertTrue(self.store.is_expired('a'))
+        self.assertEqual(self.store.stats()['evictions'], {'lru': 0, 'idle': 1})
+
+    def test_replacing_a_game_keeps_counts(self):
+        self.store['a'] = {'game': [], 'ai': AI(), 'type': 'chess'}
+        self.store['a'] = {'game': [], 'ai': AI(), 'type': 'tictactoe'}
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(self.store.stats()['by_type'], {'chess': 0, 'tictactoe': 1})
+
+    def test_idle_games_are_trimmed(self):
+        self.store['a'] = {'game': [], 'ai': AI(), 'type': 'chess'}
+        self.store['b'] = {'game': [], 'ai': AI(), 'type': 'chess'}
+        self.clock.now = 5
+        self.store.get('b')
+        self.clock.now = 11
+        self.store.sweep()
+        self.assertTrue(self.store.get('a')['ai'].released)
+        self.assertFalse(self.store.get('b')['ai'].released)
+        self.assertEqual(self.store.stats()['trimmed'], 1)
+
+    def test_memory_follows_contents(self):
+        self.store['a'] = {'game': list(range(100)), 'ai': AI(), 'type': 'chess'}
+        self.assertGreater(self.store.memory_bytes, 0)
+        self.clock.now = 101
+        self.store.sweep()
+        self.assertEqual(self.store.memory_bytes, 0)
+
+
+class LoaderTest(unittest.TestCase):
+    def test_missing_game_is_loaded_once(self):
+        loads = []
+
+        def loader(game_id):
+            loads.append(game_id)
+            return {'game': [], 'ai': None, 'type': 'chess'} if game_id == 'saved' else None
+
+        store = GameStore(loader=loader)
+        entry = store.get('saved')
+        self.assertIs(store.get('saved'), entry)
+        self.assertIsNone(store.get('unknown'))
+        self.assertEqual(loads, ['saved', 'unknown'])
+        self.assertEqual(store.stats()['restored'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
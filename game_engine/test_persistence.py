@@ -0,0 +1,46 @@
+"""Tests of GameSnapshots. Run from the game_engine directory with
+``python -m pytest test_persistence.py``."""
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from persistence import GameSnapshots
+
+
+class SnapshotsTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'games.sqlite3')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_settings_round_trip(self):
+        snapshots = GameSnapshots(self.path)
+        snapshots.save('a', 'chess', 'hard', {'fen': 'x'}, {'tt_size_mb': 4, 'ponder': True})
+        self.assertEqual(snapshots.load('a'), ('chess', 'hard', {'fen': 'x'}, {'tt_size_mb': 4, 'ponder': True}))
+        snapshots.close()
+
+        snapshots = GameSnapshots(self.path)
+        self.assertEqual(snapshots.load('a'), ('chess', 'hard', {'fen': 'x'}, {'tt_size_mb': 4, 'ponder': True}))
+        snapshots.close()
+
+    def test_file_without_settings_column(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute('CREATE TABLE games (game_id TEXT PRIMARY KEY, type TEXT NOT NULL, '
+                     'difficulty TEXT NOT NULL, state TEXT NOT NULL) WITHOUT ROWID')
+        conn.execute("INSERT INTO games VALUES ('old', 'tictactoe', 'easy', '{}')")
+        conn.commit()
+        conn.close()
+
+        snapshots = GameSnapshots(self.path)
+        self.assertEqual(snapshots.load('old'), ('tictactoe', 'easy', {}, {}))
+        snapshots.save('new', 'tictactoe', 'easy', {}, {'ponder': False})
+        snapshots.flush()
+        self.assertEqual(snapshots.load('new'), ('tictactoe', 'easy', {}, {'ponder': False}))
+        snapshots.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,36 @@
 import math
+import os
 import random
+import sys
+
+# Answers of TicTacToeAI.minimax for every position reachable in play, written
+# by ``python tictactoe.py --generate-table``. Each line is the board with '.'
+# for empty squares, the AI letter, and the square minimax picks.
+SOLVED_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tictactoe_table.txt')
+_solved_table = None
+
+
+def position_key(board, ai_letter):
+    return ''.join(board).replace(' ', '.') + ai_letter
+
+
+def load_solved_table(path=SOLVED_TABLE_PATH):
+    """Load the solved table once; an empty table means always search."""
+    global _solved_table
+    if _solved_table is None:
+        table = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        table[line[:10]] = int(line[10])
+        _solved_table = table
+    return _solved_table
 
 class TicTacToe:
+    __slots__ = ('board', 'current_winner')
+
     def __init__(self):
         self.board = [' ' for _ in range(9)]
         self.current_winner = None
@@ -13,6 +42,17 @@ class TicTacToe:
     def get_board(self):
         return self.board
 
+    def to_state(self):
+        """Compact, JSON-safe snapshot: the nine squares as one string."""
+        return {'board': ''.join(self.board), 'current_winner': self.current_winner}
+
+    @classmethod
+    def from_state(cls, state):
+        game = cls()
+        game.board = list(state['board'])
+        game.current_winner = state['current_winner']
+        return game
+
     def make_move(self, square, letter):
         if self.board[square] == ' ':
             self.board[square] = letter
@@ -53,8 +93,22 @@ class TicTacToe:
 
 
 class TicTacToeAI:
-    def __init__(self, difficulty='medium'):
+    # minimax searches the whole tree, so it never cuts off
+    cutoffs = 0
+
+    __slots__ = ('difficulty', 'use_solved_table', 'move_cache', 'nodes', 'seldepth', 'root_empty')
+
+    def __init__(self, difficulty='medium', use_solved_table=True, move_cache=None):
         self.difficulty = difficulty
+        self.use_solved_table = use_solved_table
+        # optional MoveCache shared between games for positions the solved
+        # table does not answer
+        self.move_cache = move_cache
+        # nodes counts up for the AI's lifetime; seldepth is the deepest ply
+        # reached by the current search
+        self.nodes = 0
+        self.seldepth = 0
+        self.root_empty = 0
 
     def get_move(self, game, ai_letter):
         if self.difficulty == 'easy':
@@ -74,15 +128,37 @@ class TicTacToeAI:
             return self.hard_move(game, ai_letter)
 
     def hard_move(self, game, ai_letter):
+        self.seldepth = 0
         if len(game.available_moves()) == 9:
             return random.choice([0, 2, 4, 6, 8])
 
+        if self.use_solved_table:
+            position = load_solved_table().get(position_key(game.board, ai_letter))
+            if position is not None:
+                return position
+
+        if self.move_cache is not None:
+            cache_key = ('tictactoe', ''.join(game.board), ai_letter, self.difficulty)
+            cached = self.move_cache.get(cache_key)
+            if cached is not None:
+                return random.choice(cached[1])
+
         player_letter = 'O' if ai_letter == 'X' else 'X'
-        return self.minimax(game, ai_letter, player_letter)['position']
+        self.root_empty = len(game.available_moves())
+        best = self.minimax(game, ai_letter, player_letter)
+        if self.move_cache is not None:
+            self.move_cache.put(cache_key, best['score'], [best['position']])
+        return best['position']
 
     def minimax(self, game, ai_letter, player_letter):
         max_player = ai_letter
         other_player = player_letter
+        self.nodes += 1
+
+        if game.current_winner is not None or game.is_board_full():
+            ply = self.root_empty - len(game.available_moves())
+            if ply > self.seldepth:
+                self.seldepth = ply
 
         if game.current_winner == other_player:
             return {'position': None, 'score': -1 * (len(game.available_moves()) + 1)}
@@ -112,3 +188,39 @@ class TicTacToeAI:
                     best = sim_score
 
         return best
+
+
+def build_solved_table():
+    """Run ``TicTacToeAI.minimax`` on every reachable non-final position.
+
+    Positions are those reachable by alternating moves with either letter
+    starting, for whichever letter is to move. The empty board is left out
+    because ``hard_move`` opens with a random corner or the centre.
+    """
+    ai = TicTacToeAI('hard', use_solved_table=False)
+    table = {}
+    stack = [(TicTacToe(), 'X'), (TicTacToe(), 'O')]
+    while stack:
+        game, letter = stack.pop()
+        key = position_key(game.board, letter)
+        if key in table:
+            continue
+        other = 'O' if letter == 'X' else 'X'
+        if len(game.available_moves()) < 9:
+            table[key] = ai.minimax(game, letter, other)['position']
+        for square in game.available_moves():
+            child = TicTacToe()
+            child.board = list(game.board)
+            child.make_move(square, letter)
+            if not child.game_over():
+                stack.append((child, other))
+    return table
+
+
+if __name__ == '__main__':
+    if '--generate-table' in sys.argv:
+        solved = build_solved_table()
+        with open(SOLVED_TABLE_PATH, 'w') as f:
+            for key in sorted(solved):
+                f.write(f'{key}{solved[key]}\n')
+        print(f'wrote {len(solved)} positions to {SOLVED_TABLE_PATH}')
@@ -0,0 +1,192 @@
+"""Headless engine tournament: play two AI configurations against each other.
+
+Each engine is given as comma-separated settings, for example
+``difficulty=hard,think_ms=200`` or ``difficulty=medium,max_depth=4``;
+``max_depth`` and ``think_ms`` override the difficulty's defaults where the
+game supports them; ``use_book=0`` and ``quiescence=0`` turn off the chess
+opening book and quiescence search. Games alternate colours and open with a
+few random plies so that the deterministic engines do not replay the same
+game. Run from the game_engine directory:
+
+    python tournament.py chess --a difficulty=hard --b difficulty=medium \\
+        --games 20 --processes 4 --output results.json
+
+The summary (wins, draws and losses for engine A, average think time,
+nodes per second and the Elo difference) is printed and written as JSON,
+so results can be compared between releases.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from chess import Chess, ChessAI, ChessAIConfig, CHESS_AI_CONFIGS
+from connectfour import ConnectFour, ConnectFourAI, ConnectFourAIConfig, CONNECTFOUR_AI_CONFIGS
+from tictactoe import TicTacToe, TicTacToeAI
+
+# Games still running after this many plies are scored as draws.
+MAX_PLIES = {'tictactoe': 9, 'connectfour': 42, 'chess': 300}
+
+
+def parse_engine(text):
+    engine = {'difficulty': 'medium'}
+    for part in filter(None, text.split(',')):
+        name, _, value = part.partition('=')
+        engine[name.strip()] = int(value) if name.strip() in ('max_depth', 'think_ms', 'use_book', 'quiescence') else value.strip()
+    return engine
+
+
+def make_ai(game_type, engine):
+    difficulty = engine['difficulty']
+    if game_type == 'chess':
+        defaults = CHESS_AI_CONFIGS[difficulty]
+        config = ChessAIConfig(difficulty, engine.get('max_depth', defaults.max_depth),
+                               engine.get('think_ms', defaults.think_ms), use_book=bool(engine.get('use_book', 1)),
+                               quiescence=bool(engine.get('quiescence', 1)))
+        return ChessAI(config=config)
+    elif game_type == 'connectfour':
+        defaults = CONNECTFOUR_AI_CONFIGS[difficulty]
+        return ConnectFourAI(config=ConnectFourAIConfig(difficulty, engine.get('max_depth', defaults.max_depth)))
+    else:
+        return TicTacToeAI(difficulty)
+
+
+def random_move(game_type, game, side):
+    if game_type == 'chess':
+        moves = game.get_all_valid_moves_for_color(side == 'white')
+        return random.choice(moves) if moves else None
+    return random.choice(game.available_moves())
+
+
+def play_move(game_type, game, side, move):
+    if game_type == 'chess':
+        game.make_move(*move)
+    else:
+        game.make_move(move, side)
+
+
+def think(game_type, ai, game, side):
+    if game_type == 'chess':
+        return ai.get_move(game, side == 'white')
+    return ai.get_move(game, side)
+
+
+def is_draw(game_type, game):
+    if game_type == 'connectfour':
+        return game.is_board_full()
+    if game_type == 'tictactoe':
+        return not game.available_moves()
+    return False
+
+
+def play_game(game_type, engines, a_first, opening_plies, seed):
+    """Play one game; return the result from engine A's point of view."""
+    random.seed(seed)
+    game = {'tictactoe': TicTacToe, 'connectfour': ConnectFour, 'chess': Chess}[game_type]()
+    sides = {'tictactoe': ('X', 'O'), 'connectfour': ('R', 'Y'), 'chess': ('white', 'black')}[game_type]
+    ais = [make_ai(game_type, engine) for engine in engines]
+    players = (0, 1) if a_first else (1, 0)
+    think_time = [0.0, 0.0]
+    nodes = [0, 0]
+    moves = [0, 0]
+
+    ply = 0
+    while not game.game_over() and not is_draw(game_type, game) and ply < MAX_PLIES[game_type]:
+        side = sides[ply % 2]
+        player = players[ply % 2]
+        if ply < opening_plies:
+            move = random_move(game_type, game, side)
+        else:
+            ai = ais[player]
+            nodes_before = getattr(ai, 'nodes', 0)
+            start = time.perf_counter()
+            move = think(game_type, ai, game, side)
+            think_time[player] += time.perf_counter() - start
+            nodes[player] += getattr(ai, 'nodes', 0) - nodes_before
+            moves[player] += 1
+        if move is None:
+            break
+        play_move(game_type, game, side, move)
+        ply += 1
+
+    winner = game.current_winner
+    if winner not in sides:
+        score = 0.5
+    else:
+        score = 1.0 if players[sides.index(winner)] == 0 else 0.0
+    return {'score': score, 'plies': ply, 'think_time': think_time, 'nodes': nodes, 'moves': moves}
+
+
+def elo_difference(score):
+    """Elo difference implied by an expected score, clamped away from 0 and 1."""
+    score = min(max(score, 0.001), 0.999)
+    return -400 * math.log10(1 / score - 1)
+
+
+def run_tournament(game_type, engine_a, engine_b, games=10, processes=None, opening_plies=2, seed=0):
+    engines = (engine_a, engine_b)
+    processes = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(play_game, game_type, engines, i % 2 == 0, opening_plies, seed + i)
+                   for i in range(games)]
+        results = [future.result() for future in futures]
+
+    wins = sum(1 for result in results if result['score'] == 1.0)
+    losses = sum(1 for result in results if result['score'] == 0.0)
+    draws = games - wins - losses
+    score = (wins + draws / 2) / games
+    summary = {
+        'game_type': game_type,
+        'games': games,
+        'opening_plies': opening_plies,
+        'seed': seed,
+        'engines': {'a': engine_a, 'b': engine_b},
+        'a_wins': wins,
+        'draws': draws,
+        'a_losses': losses,
+        'a_score': score,
+        'elo_difference': round(elo_difference(score), 1),
+        'average_plies': sum(result['plies'] for result in results) / games,
+    }
+    for index, name in enumerate(('a', 'b')):
+        think_time = sum(result['think_time'][index] for result in results)
+        nodes = sum(result['nodes'][index] for result in results)
+        moves = sum(result['moves'][index] for result in results)
+        summary[name] = {
+            'moves': moves,
+            'average_think_ms': round(think_time * 1000 / moves, 2) if moves else 0.0,
+            'nodes': nodes,
+            'nps': round(nodes / think_time) if think_time else 0,
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play two engine configurations against each other.')
+    parser.add_argument('game_type', choices=('tictactoe', 'connectfour', 'chess'))
+    parser.add_argument('--a', default='difficulty=hard', help='engine A settings')
+    parser.add_argument('--b', default='difficulty=medium', help='engine B settings')
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--opening-plies', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the summary as JSON to this file')
+    args = parser.parse_args()
+
+    summary = run_tournament(args.game_type, parse_engine(args.a), parse_engine(args.b), args.games,
+                             args.processes, args.opening_plies, args.seed)
+    print(f"A {summary['a_wins']} / draw {summary['draws']} / B {summary['a_losses']}  "
+          f"score {summary['a_score']:.3f}  Elo {summary['elo_difference']:+.0f}")
+    for name in ('a', 'b'):
+        stats = summary[name]
+        print(f"{name.upper()}: {stats['average_think_ms']:.1f} ms/move, {stats['nps']} nodes/s")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
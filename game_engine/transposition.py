@@ -0,0 +1,77 @@
+# Bound types stored with each entry: EXACT scores are the true minimax value,
+# LOWER means the true value is at least the score (the search failed high)
+# and UPPER means it is at most the score (the search failed low).
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class TranspositionTable:
+    """Fixed-size hash table of search results keyed by position hash.
+
+    Each slot holds a single ``(key, depth, score, flag, best_move, generation)``
+    tuple. A new result replaces the slot when it is for the same position,
+    when the slot was written by an earlier search, or when it was searched at
+    least as deep as the current occupant (depth-preferred replacement).
+    """
+
+    __slots__ = ('size', 'entries', 'generation', 'used', 'hits', 'misses', 'stores')
+
+    # Rough cost of one filled slot: the list pointer plus the entry tuple
+    # and the ints it references.
+    ENTRY_BYTES = 160
+
+    def __init__(self, size_mb=1):
+        self.size = max(1, int(size_mb * 1024 * 1024) // self.ENTRY_BYTES)
+        self.entries = None
+        self.generation = 0
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Mark the start of a new search so older entries become replaceable."""
+        self.generation += 1
+
+    def probe(self, key):
+        if self.entries is not None:
+            entry = self.entries[key % self.size]
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, score, flag, best_move=None):
+        if self.entries is None:
+            self.entries = [None] * self.size
+        index = key % self.size
+        old = self.entries[index]
+        if old is None:
+            self.used += 1
+        elif old[0] != key and old[5] == self.generation and depth < old[1]:
+            return
+        self.entries[index] = (key, depth, score, flag, best_move, self.generation)
+        self.stores += 1
+
+    def clear(self):
+        self.entries = None
+        self.used = 0
+
+    def memory_bytes(self):
+        if self.entries is None:
+            return 0
+        return self.size * 8 + self.used * (self.ENTRY_BYTES - 8)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'stores': self.stores,
+            'used': self.used,
+            'size': self.size,
+            'memory_bytes': self.memory_bytes()
+        }
@@ -14,6 +14,7 @@ export default function Chess({ difficulty, onBack }: ChessProps) {
   const [gameId] = useState('chess_' + Date.now());
   const [selectedSquare, setSelectedSquare] = useState<[number, number] | null>(null);
   const [validMoves, setValidMoves] = useState<[number, number][]>([]);
+  const [moveMap, setMoveMap] = useState<Record<string, [number, number][]> | null>(null);
   const [isThinking, setIsThinking] = useState(false);
 
   useEffect(() => {
@@ -25,10 +26,11 @@ export default function Chess({ difficulty, onBack }: ChessProps) {
       const response = await fetch('http://localhost:8001/api/chess/new', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ game_id: gameId, difficulty })
+        body: JSON.stringify({ game_id: gameId, difficulty, move_map: true })
       });
       const data = await response.json();
       setBoard(data.board);
+      setMoveMap(data.move_map ?? null);
       setGameOver(false);
       setWinner(null);
       setCurrentTurn(data.current_turn);
@@ -65,6 +67,11 @@ export default function Chess({ difficulty, onBack }: ChessProps) {
   };
 
   const selectSquare = async (row: number, col: number) => {
+    if (moveMap) {
+      setSelectedSquare([row, col]);
+      setValidMoves(moveMap[`${row},${col}`] ?? []);
+      return;
+    }
     try {
       const response = await fetch('http://localhost:8001/api/chess/valid_moves', {
         method: 'POST',
@@ -86,7 +93,7 @@ export default function Chess({ difficulty, onBack }: ChessProps) {
       const response = await fetch('http://localhost:8001/api/chess/move', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ game_id: gameId, from_row: fromRow, from_col: fromCol, to_row: toRow, to_col: toCol })
+        body: JSON.stringify({ game_id: gameId, from_row: fromRow, from_col: fromCol, to_row: toRow, to_col: toCol, move_map: true })
       });
       const data = await response.json();
 
@@ -96,6 +103,7 @@ export default function Chess({ difficulty, onBack }: ChessProps) {
       }
 
       setBoard(data.board);
+      setMoveMap(data.move_map ?? null);
       setGameOver(data.game_over);
       setWinner(data.winner);
       setCurrentTurn(data.current_turn);
@@ -145,7 +153,7 @@ export default function Chess({ difficulty, onBack }: ChessProps) {
             <h2 className="text-4xl font-bold text-white mb-2">Chess</h2>
             {gameOver ? (
               <p className="text-2xl text-cyan-400 font-semibold">
-                {winner ? `${winner === 'white' ? 'White' : 'Black'} wins!` : "It's a draw!"}
+                {winner && winner !== 'draw' ? `${winner === 'white' ? 'White' : 'Black'} wins!` : "It's a draw!"}
               </p>
             ) : isThinking ? (
               <p className="text-xl text-yellow-400">AI is thinking...</p>